@@ -0,0 +1,48 @@
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from app.db.session import engine
+from app.api.v1.endpoints.third_party.travel.resilience import circuits_status
+from app.api.v1.endpoints.third_party.travel.scheduler import limiters_status
+from app.api.v1.endpoints.third_party.travel.token_manager import token_manager
+from app.utils.admission import quote_admission
+
+router = APIRouter()
+
+
+@router.get("/live")
+async def live():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready(require_insurers: bool = False):
+    # Ready once the DB answers. Insurer warm-up runs in the background and is
+    # only reported, unless the caller asks to gate on it.
+    try:
+        async with asyncio.timeout(2):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        database = "ok"
+    except Exception as exc:
+        database = f"error: {exc}"
+
+    insurers = token_manager.status()
+    insurers_ready = bool(insurers) and all(i["state"] == "ready" for i in insurers.values())
+
+    is_ready = database == "ok" and (insurers_ready or not require_insurers)
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={
+            "status": "ready" if is_ready else "not_ready",
+            "database": database,
+            "insurers_ready": insurers_ready,
+            "insurers": insurers,
+            "circuits": circuits_status(),
+            "outbound": limiters_status(),
+            "admission": quote_admission.status(),
+        },
+    )
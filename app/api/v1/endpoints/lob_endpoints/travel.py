@@ -1,23 +1,97 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from functools import partial
+from typing import AsyncIterator, Optional
 
-from app.db.session import get_db
-from app.schemas.travel import TravelInsuranceRequest
-from app.api.v1.endpoints.third_party.travel.rak import get_rak_quotes
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.schemas.travel import StoredQuote, TravelInsuranceRequest, TravelQuoteBatchRequest
+from app.services.quote_batch_service import QuoteBatchService
+from app.services.quote_store import quote_store
+from app.api.v1.endpoints.third_party.travel.registry import get_adapters
+from app.api.v1.endpoints.third_party.travel.quote_cache import quote_cache
+from app.utils.admission import AdmissionRejected, quote_admission
+from app.utils.metrics import sample_request
+from app.utils.security import verify_access_token
 from app.utils.sse import sse_parallel
 
 router = APIRouter()
 
-@router.post("/get-quotes")
-async def get_quotes(payload: TravelInsuranceRequest, db: Session = Depends(get_db)):
-    async def rak_job():
-        return get_rak_quotes(payload, db)
+
+def _authenticated_partner(request: Request) -> Optional[str]:
+    # the fair share follows the verified token subject, not partner_code;
+    # quoting stays open to anonymous callers, who share the global caps
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        claims = verify_access_token(token)
+    except HTTPException:
+        return None
+    subject = claims.get("sub")
+    return str(subject) if subject else None
+
+
+async def admit_quote_stream(request: Request) -> AsyncIterator[None]:
+    # runs before the body is validated and is released only once the stream
+    # has finished (or the client went away)
+    partner = _authenticated_partner(request)
+
+    try:
+        await quote_admission.acquire(partner)
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many quote requests in progress, please retry",
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    try:
+        yield
+    finally:
+        quote_admission.release(partner)
+
+
+@router.post("/get-quotes", dependencies=[Depends(admit_quote_stream)])
+async def get_quotes(payload: TravelInsuranceRequest, request: Request):
+    # decides once per request whether the stage hooks profile it
+    sample_request()
 
     func_list = [
         {
-            "name": "rak",   
-            "func": rak_job
+            "name": adapter.code,
+            "func": partial(adapter.get_quotes, payload),
+            "timeout": adapter.deadline,
         }
+        for adapter in get_adapters()
     ]
 
-    return await sse_parallel(func_list)
+    return await sse_parallel(func_list, request)
+
+
+@router.post("/get-quotes/batch")
+async def get_quotes_batch(payload: TravelQuoteBatchRequest):
+    if len(payload.requests) > settings.QUOTE_BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch may contain at most {settings.QUOTE_BATCH_MAX_REQUESTS} requests",
+        )
+
+    # one NDJSON line per (input index, insurer), in completion order
+    return StreamingResponse(
+        QuoteBatchService.stream(payload.requests),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/quote-cache/stats")
+async def get_quote_cache_stats():
+    return quote_cache.stats()
+
+
+@router.get("/quotes/{quote_id}", response_model=StoredQuote)
+async def get_quote(quote_id: str):
+    # priced plan as streamed by /get-quotes; no insurer call
+    quote = await quote_store.get(quote_id)
+    if quote is None:
+        raise HTTPException(status_code=404, detail="Quote not found")
+    return quote
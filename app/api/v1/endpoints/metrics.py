@@ -0,0 +1,77 @@
+from typing import List
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.api.v1.endpoints.third_party.travel.quote_cache import quote_cache
+from app.api.v1.endpoints.third_party.travel.resilience import circuits_status
+from app.api.v1.endpoints.third_party.travel.scheduler import limiters_status
+from app.api.v1.endpoints.third_party.travel.token_manager import token_manager
+from app.services.quote_store import quote_store
+from app.utils import metrics
+from app.utils.admission import quote_admission
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _collect_quote_cache() -> List[str]:
+    stats = quote_cache.stats()
+    lines = []
+    for key in ("hits", "misses", "coalesced", "evictions", "expirations"):
+        name = f"quote_cache_{key}_total"
+        lines += [f"# TYPE {name} counter", f"{name} {stats[key]}"]
+    for key in ("size", "in_flight"):
+        name = f"quote_cache_{key}"
+        lines += [f"# TYPE {name} gauge", f"{name} {stats[key]}"]
+    return lines
+
+
+def _collect_quote_store() -> List[str]:
+    stats = quote_store.stats()
+    lines = ["# TYPE quote_store_queued gauge", f"quote_store_queued {stats['queued']}"]
+    for key in ("written", "dropped", "failed"):
+        name = f"quote_store_{key}_total"
+        lines += [f"# TYPE {name} counter", f"{name} {stats[key]}"]
+    return lines
+
+
+def _collect_insurers() -> List[str]:
+    lines = ["# TYPE insurer_circuit_state gauge"]
+    for name, status in circuits_status().items():
+        lines.append(f'insurer_circuit_state{{circuit="{name}"}} {CIRCUIT_STATES[status["state"]]}')
+
+    limiters = limiters_status()
+    for key in ("active", "waiting"):
+        lines.append(f"# TYPE insurer_outbound_{key} gauge")
+        for insurer, status in limiters.items():
+            lines.append(f'insurer_outbound_{key}{{insurer="{insurer}"}} {status[key]}')
+
+    lines.append("# TYPE insurer_token_ready gauge")
+    for insurer, status in token_manager.status().items():
+        ready = 1 if status.get("state") == "ready" else 0
+        lines.append(f'insurer_token_ready{{insurer="{insurer}"}} {ready}')
+    return lines
+
+
+def _collect_admission() -> List[str]:
+    status = quote_admission.status()
+    lines = []
+    for key in ("in_flight", "queued"):
+        name = f"admission_{key}"
+        lines += [f"# TYPE {name} gauge", f'{name}{{route="{quote_admission.name}"}} {status[key]}']
+    return lines
+
+
+metrics.register_collector(_collect_quote_cache)
+metrics.register_collector(_collect_quote_store)
+metrics.register_collector(_collect_insurers)
+metrics.register_collector(_collect_admission)
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
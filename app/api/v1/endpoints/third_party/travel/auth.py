@@ -1,20 +1,49 @@
-import requests
-from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional
 from app.db.models.third_party_api import ThirdPartyAuth
+from app.api.v1.endpoints.third_party.travel import transport
+from app.api.v1.endpoints.third_party.travel.resilience import get_circuit
+from app.api.v1.endpoints.third_party.travel.scheduler import outbound
+from app.core.config import settings
 from datetime import datetime, timedelta, timezone
 
 
-def authenticate_provider(db: Session, provider: ThirdPartyAuth):
+# auth_config key holding the bearer token for each insurer
+TOKEN_FIELDS: Dict[str, str] = {
+    "rak": "token",
+    "gulf": "access_token",
+    "liva": "access_token",
+}
+
+
+def provider_key(provider: ThirdPartyAuth) -> Optional[str]:
     name = provider.name.lower()
+    for key in TOKEN_FIELDS:
+        if key in name:
+            return key
+    return None
+
+
+async def _post_auth(insurer: str, url: str, **kwargs):
+    async with outbound(insurer):
+        return await get_circuit(f"{insurer}:auth").call(
+            lambda timeout: transport.post(
+                url, total_timeout=timeout, insurer=insurer, operation="auth", **kwargs
+            ),
+            max_timeout=settings.INSURER_HTTP_TOTAL_TIMEOUT,
+        )
+
+
+async def authenticate_provider(provider: ThirdPartyAuth):
+    key = provider_key(provider)
 
-    if "rak" in name:
-        return authenticate_rak(db, provider)
+    if key == "rak":
+        return await authenticate_rak(provider)
 
-    elif "gulf" in name:
-        return authenticate_gulf(db, provider)
+    elif key == "gulf":
+        return await authenticate_gulf(provider)
 
-    elif "liva" in name:
-        return authenticate_liva(db, provider)
+    elif key == "liva":
+        return await authenticate_liva(provider)
 
     else:
         print(f"[AUTH] No auth handler found for: {provider.name}")
@@ -23,7 +52,7 @@ def authenticate_provider(db: Session, provider: ThirdPartyAuth):
 
 
 
-def authenticate_rak(db: Session, provider: ThirdPartyAuth):
+async def authenticate_rak(provider: ThirdPartyAuth):
     url = provider.base_url + provider.auth_url
 
     body = {
@@ -38,33 +67,25 @@ def authenticate_rak(db: Session, provider: ThirdPartyAuth):
     }
 
     print(f"[AUTH-RAK] Calling: {url}")
+    response = await _post_auth("rak", url, json=body, headers=headers)
+    data = response.json()
 
-    if is_valid_api_call_time(provider) is False:
-        response = requests.post(url, json=body, headers=headers)
-        data = response.json()
-
-        if "token" not in data:
-            print("[AUTH-RAK] Auth failed:", data)
-            return None
+    if "token" not in data:
+        print("[AUTH-RAK] Auth failed:", data)
+        return None
 
-        provider.auth_config["token"] = data["token"]
-        provider.auth_config["token_expires_at"] = (
-            datetime.now(timezone.utc) + timedelta(hours=1)
-        ).isoformat()
+    provider.auth_config["token"] = data["token"]
+    provider.auth_config["token_expires_at"] = (
+        datetime.now(timezone.utc) + timedelta(hours=1)
+    ).isoformat()
 
-        db.commit()
-        db.refresh(provider)
+    print(f"[AUTH-RAK] Token updated for {provider.name}")
+    return data
 
-        print(f"[AUTH-RAK] Token updated for {provider.name}")
-        return data
-    else:
-        print(f"[AUTH-RAK] Token still valid for {provider.name}")
-        return provider.auth_config.get("token")
 
 
 
-
-def authenticate_gulf(db: Session, provider: ThirdPartyAuth):
+async def authenticate_gulf(provider: ThirdPartyAuth):
     url = provider.base_url + provider.auth_url
 
     payload = {
@@ -77,33 +98,26 @@ def authenticate_gulf(db: Session, provider: ThirdPartyAuth):
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
     print(f"[AUTH-GULF] Calling: {url}")
-    if is_valid_api_call_time(provider) is False:
-     response = requests.post(url, data=payload, headers=headers)
-     data = response.json()
-
-     if "access_token" not in data:
-         print("[AUTH-GULF] Auth failed:", data)
-         return None
-
-     provider.auth_config["access_token"] = data["access_token"]
-     provider.auth_config["token_type"] = data["token_type"]
-     provider.auth_config["expires_in"] = data["expires_in"]
-     provider.auth_config["token_expires_at"] = (
-        datetime.utcnow() + timedelta(seconds=data["expires_in"])
-     ).isoformat()
-
-     db.commit()
-     db.refresh(provider)
-
-     print(f"[AUTH-GULF] Token updated for {provider.name}")
-     return data
-    else:
-        print(f"[AUTH-GULF] Token still valid for {provider.name}")
-        return provider.auth_config.get("token")
+    response = await _post_auth("gulf", url, data=payload, headers=headers)
+    data = response.json()
 
+    if "access_token" not in data:
+        print("[AUTH-GULF] Auth failed:", data)
+        return None
+
+    provider.auth_config["access_token"] = data["access_token"]
+    provider.auth_config["token_type"] = data["token_type"]
+    provider.auth_config["expires_in"] = data["expires_in"]
+    provider.auth_config["token_expires_at"] = (
+        datetime.now(timezone.utc) + timedelta(seconds=data["expires_in"])
+    ).isoformat()
+
+    print(f"[AUTH-GULF] Token updated for {provider.name}")
+    return data
 
 
-def authenticate_liva(db: Session, provider: ThirdPartyAuth):
+
+async def authenticate_liva(provider: ThirdPartyAuth):
     url = provider.base_url + provider.auth_url
 
     payload = {
@@ -123,43 +137,45 @@ def authenticate_liva(db: Session, provider: ThirdPartyAuth):
     }
 
     print(f"[AUTH-LIVA] Calling: {url}")
-    if is_valid_api_call_time(provider) is False:
-     response = requests.post(url, data=payload, headers=headers)
-     data = response.json()
-
-     if "access_token" not in data:
-         print("[AUTH-LIVA] Auth failed:", data)
-         return None
-
-     provider.auth_config["access_token"] = data["access_token"]
-     provider.auth_config["token_type"] = data["token_type"]
-     provider.auth_config["expires_in"] = data["expires_in"]
-     provider.auth_config["token_expires_at"] = (
-        datetime.utcnow() + timedelta(seconds=data["expires_in"])
-     ).isoformat()
-
-     db.commit()
-     db.refresh(provider)
-
-     print(f"[AUTH-LIVA] Token updated for {provider.name}")
-     return data
-    else:
-        print(f"[AUTH-LIVA] Token still valid for {provider.name}")
-        return provider.auth_config.get("token")
+    response = await _post_auth("liva", url, data=payload, headers=headers)
+    data = response.json()
 
+    if "access_token" not in data:
+        print("[AUTH-LIVA] Auth failed:", data)
+        return None
 
+    provider.auth_config["access_token"] = data["access_token"]
+    provider.auth_config["token_type"] = data["token_type"]
+    provider.auth_config["expires_in"] = data["expires_in"]
+    provider.auth_config["token_expires_at"] = (
+        datetime.now(timezone.utc) + timedelta(seconds=data["expires_in"])
+    ).isoformat()
 
+    print(f"[AUTH-LIVA] Token updated for {provider.name}")
+    return data
 
-def authenticate_all_providers(db: Session):
-    providers = db.query(ThirdPartyAuth).all()
 
-    for provider in providers:
-        print(f"\n[AUTH] Authenticating → {provider.name}")
-        authenticate_provider(db, provider)
 
 
-def is_valid_api_call_time(provider: ThirdPartyAuth) -> bool:
-    two_hours_ago = datetime.now(timezone.utc) - timedelta(hours=2)
-    if not provider.updated_at or provider.updated_at < two_hours_ago:
+def token_expires_at(auth_config: Optional[Dict[str, Any]]) -> Optional[datetime]:
+    raw = (auth_config or {}).get("token_expires_at")
+    if not raw:
+        return None
+    try:
+        expires_at = datetime.fromisoformat(raw)
+    except (TypeError, ValueError):
+        return None
+    # Older rows were stamped with naive utcnow()
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at
+
+
+def is_valid_api_call_time(provider: ThirdPartyAuth, margin: timedelta = timedelta(0)) -> bool:
+    key = provider_key(provider)
+    if key is None or not (provider.auth_config or {}).get(TOKEN_FIELDS[key]):
+        return False
+    expires_at = token_expires_at(provider.auth_config)
+    if expires_at is None:
         return False
-    return True
\ No newline at end of file
+    return datetime.now(timezone.utc) + margin < expires_at
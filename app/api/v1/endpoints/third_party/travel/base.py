@@ -0,0 +1,115 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.schemas.travel import TravelInsuranceRequest
+from app.api.v1.endpoints.third_party.travel import transport
+from app.api.v1.endpoints.third_party.travel.errors import InsurerError, InsurerQueueTimeout
+from app.api.v1.endpoints.third_party.travel.quote_cache import quote_cache
+from app.api.v1.endpoints.third_party.travel.resilience import get_circuit
+from app.api.v1.endpoints.third_party.travel.scheduler import outbound, try_outbound
+from app.services.quote_store import quote_store
+from app.utils.metrics import stage
+
+
+# ---------------------------------------------------------------------------
+# Insurer adapter interface
+# ---------------------------------------------------------------------------
+#
+# Each insurer implements three steps: build its request body from the
+# canonical TravelInsuranceRequest, call its rating API, and map the raw
+# response to canonical plan cards. get_quotes() glues them together with the
+# quote cache and a uniform response/error shape, so /get-quotes can fan out
+# over every registered adapter without knowing insurer specifics.
+
+class InsurerAdapter(ABC):
+    code: str           # short key used for tokens, cache and settings, e.g. "rak"
+    insurer: str        # value of "insurer" in responses, e.g. "RAK"
+    insurer_name: str   # display name, e.g. "RAK Insurance"
+
+    @property
+    def deadline(self) -> float:
+        return settings.INSURER_QUOTE_DEADLINE_OVERRIDES.get(
+            self.code, settings.INSURER_QUOTE_DEADLINE_SECONDS
+        )
+
+    @abstractmethod
+    def build_request(self, payload: TravelInsuranceRequest) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    async def call(self, request_body: Dict[str, Any]) -> Any:
+        ...
+
+    @abstractmethod
+    def map_plans(self, raw_response: Any) -> List[Dict[str, Any]]:
+        ...
+
+    async def get_quotes(self, payload: TravelInsuranceRequest) -> Dict[str, Any]:
+        with stage("build_request", self.code):
+            request_body = self.build_request(payload)
+        return await self.quote(request_body)
+
+    async def quote(
+        self,
+        request_body: Dict[str, Any],
+        on_upstream: Optional[Callable[[], None]] = None,
+    ) -> Dict[str, Any]:
+        # on_upstream fires only when this call really goes to the insurer,
+        # not on a cache hit or when it joins someone else's in-flight fetch
+        async def fetch() -> Dict[str, Any]:
+            if on_upstream is not None:
+                on_upstream()
+            return await self.fetch_quotes(request_body)
+
+        return await quote_cache.get_or_fetch(self.code, request_body, fetch)
+
+    async def fetch_quotes(self, request_body: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            raw_response = await self.call(request_body)
+        except InsurerQueueTimeout:
+            # surfaced as its own event status, and never cached
+            raise
+        except InsurerError as exc:
+            return self.error_response(str(exc))
+        except Exception as exc:
+            return self.error_response(f"Request to {self.insurer} failed: {exc}")
+
+        with stage("map", self.code):
+            plans = self.map_plans(raw_response)
+
+        if settings.QUOTE_STORE_ENABLED:
+            # stamps quote_id on each plan; the insert happens in the background
+            quote_store.record(self.code, request_body, plans)
+
+        return {
+            "insurer": self.insurer,
+            "insurer_name": self.insurer_name,
+            "plans": plans,
+            "error": None,
+        }
+
+    async def post_rating(self, url: str, **kwargs: Any) -> httpx.Response:
+        # rating calls wait for an outbound slot, then go through the insurer's
+        # circuit with an adaptive timeout
+        with stage("upstream", self.code):
+            async with outbound(self.code):
+                return await get_circuit(f"{self.code}:rating").call(
+                    lambda timeout: transport.post(
+                        url, total_timeout=timeout, insurer=self.code, operation="rating", **kwargs
+                    ),
+                    max_timeout=self.deadline,
+                    hedge=settings.INSURER_HEDGE_ENABLED,
+                    hedge_slot=lambda: try_outbound(self.code),
+                )
+
+    def error_response(self, message: str) -> Dict[str, Any]:
+        return {
+            "insurer": self.insurer,
+            "insurer_name": self.insurer_name,
+            "plans": [],
+            "raw_insurer_response": None,
+            "error": message,
+        }
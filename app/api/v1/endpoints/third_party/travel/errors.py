@@ -0,0 +1,14 @@
+# Raised by an adapter when the insurer call cannot produce a quote
+class InsurerError(Exception):
+    pass
+
+
+# Raised instead of calling an insurer whose circuit is open
+class CircuitOpenError(InsurerError):
+    pass
+
+
+# Raised when an outbound call waited too long for a rate-limit / concurrency
+# slot; reported as its own status in the SSE event rather than an error card
+class InsurerQueueTimeout(InsurerError):
+    event_status = "queue_timeout"
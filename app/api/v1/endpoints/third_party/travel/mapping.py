@@ -0,0 +1,94 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# ---------------------------------------------------------------------------
+# Declarative CDM coverage mapping
+# ---------------------------------------------------------------------------
+#
+# A coverage spec says, per coverage_summary section, which insurer cover id
+# feeds which CDM field:
+#
+#     {"emergency": {"emergency_medical_amount": "1200", ...}, ...}
+#
+# compile_coverage_spec() turns it into a reverse index (cover id -> CDM
+# slots) once at import, so each plan is mapped in a single pass over its
+# covers instead of one linear scan per CDM field. As before, the first cover
+# with a given id wins.
+
+CoverageSpec = Dict[str, Dict[str, str]]
+AmountExtractor = Callable[[Dict[str, Any]], Optional[str]]
+
+
+class CompiledCoverageMapper:
+
+    def __init__(
+        self,
+        spec: CoverageSpec,
+        extract_amount: AmountExtractor,
+        cover_id_key: str = "id",
+    ):
+        self.spec = spec
+        self.extract_amount = extract_amount
+        self.cover_id_key = cover_id_key
+
+        self._sections: Tuple[Tuple[str, Tuple[str, ...]], ...] = tuple(
+            (section, tuple(fields)) for section, fields in spec.items()
+        )
+        # indexed by the id as a string and, for numeric ids, as an int too,
+        # so integer ids in the payload hit the index without a str() call
+        targets: Dict[str, List[Tuple[str, str]]] = {}
+        for section, fields in spec.items():
+            for field, cover_id in fields.items():
+                targets.setdefault(str(cover_id), []).append((section, field))
+
+        self._slots: Dict[Any, Tuple[str, Tuple[Tuple[str, str], ...]]] = {}
+        for cover_id, slots in targets.items():
+            entry = (cover_id, tuple(slots))
+            self._slots[cover_id] = entry
+            if cover_id.isdigit() and str(int(cover_id)) == cover_id:
+                self._slots[int(cover_id)] = entry
+        self._wanted = len(targets)
+
+    def map(self, covers: Optional[Iterable[Dict[str, Any]]]) -> Dict[str, Dict[str, Optional[str]]]:
+        summary = {section: dict.fromkeys(fields) for section, fields in self._sections}
+        if not covers:
+            return summary
+
+        slots = self._slots
+        remaining = self._wanted
+        seen = set()
+        id_key = self.cover_id_key
+        extract_amount = self.extract_amount
+
+        for cover in covers:
+            raw_id = cover.get(id_key)
+            entry = slots.get(raw_id)
+            if entry is None:
+                if raw_id is None or isinstance(raw_id, (str, int)):
+                    continue
+                entry = slots.get(str(raw_id))
+                if entry is None:
+                    continue
+
+            cover_id, targets = entry
+            if cover_id in seen:
+                continue
+            seen.add(cover_id)
+
+            amount = extract_amount(cover)
+            for section, field in targets:
+                summary[section][field] = amount
+
+            remaining -= 1
+            if not remaining:
+                break
+
+        return summary
+
+
+def compile_coverage_spec(
+    spec: CoverageSpec,
+    extract_amount: AmountExtractor,
+    cover_id_key: str = "id",
+) -> CompiledCoverageMapper:
+    return CompiledCoverageMapper(spec, extract_amount, cover_id_key)
@@ -0,0 +1,157 @@
+import asyncio
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+
+
+# ---------------------------------------------------------------------------
+# TTL/LRU cache in front of insurer rating calls
+# ---------------------------------------------------------------------------
+#
+# Keyed on a canonical hash of the insurer request body (the output of
+# build_rak_request and friends). That body carries the traveller's names,
+# dates of birth, email and phone number, so entries are shared by repeats of
+# the same person's request - page reloads, retries, double submits and
+# duplicate rows in a batch - not by different users asking for the same
+# trip. Identical requests that arrive while the first one is still in
+# flight wait for it instead of calling the insurer again; once every waiter
+# has gone (disconnect, deadline), the upstream call is cancelled too. Error
+# responses are never cached.
+
+
+def request_fingerprint(insurer: str, request_body: Dict[str, Any]) -> str:
+    canonical = orjson.dumps(request_body, option=orjson.OPT_SORT_KEYS, default=str)
+    return hashlib.sha256(insurer.encode() + b":" + canonical).hexdigest()
+
+
+class QuoteCache:
+
+    def __init__(
+        self,
+        max_entries: int,
+        default_ttl: float,
+        ttl_overrides: Optional[Dict[str, float]] = None,
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttl_overrides = {k.lower(): v for k, v in (ttl_overrides or {}).items()}
+
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def ttl_for(self, insurer: str) -> float:
+        return self.ttl_overrides.get(insurer.lower(), self.default_ttl)
+
+    async def get_or_fetch(
+        self,
+        insurer: str,
+        request_body: Dict[str, Any],
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        key = request_fingerprint(insurer, request_body)
+
+        cached = self._get(key)
+        if cached is not None:
+            self.hits += 1
+            return copy.deepcopy(cached)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return copy.deepcopy(await self._wait(key, task))
+
+        self.misses += 1
+        task = asyncio.create_task(self._fetch_and_store(insurer, key, fetch))
+        self._inflight[key] = task
+        return await self._wait(key, task)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    # -- internals ----------------------------------------------------------
+
+    async def _wait(self, key: str, task: asyncio.Task) -> Dict[str, Any]:
+        # shielded so one caller leaving does not cancel the shared fetch for
+        # the others; the last one to leave cancels it
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    task.cancel()
+                    # later callers start a fresh fetch rather than join this one
+                    if self._inflight.get(key) is task:
+                        del self._inflight[key]
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def _fetch_and_store(
+        self,
+        insurer: str,
+        key: str,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        try:
+            result = await fetch()
+            if not result.get("error"):
+                self._put(key, result, self.ttl_for(insurer))
+            return result
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+    def _put(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+quote_cache = QuoteCache(
+    max_entries=settings.QUOTE_CACHE_MAX_ENTRIES,
+    default_ttl=settings.QUOTE_CACHE_TTL_SECONDS,
+    ttl_overrides=settings.QUOTE_CACHE_TTL_OVERRIDES,
+)
@@ -1,11 +1,13 @@
 from typing import Dict, Any, List, Optional
-from datetime import date, datetime
-import json
-import requests
-from sqlalchemy.orm import Session
-from app.schemas.travel import TravelInsuranceRequest
-from app.db.models.third_party_api import ThirdPartyAuth
-from app.api.v1.endpoints.third_party.travel.auth import authenticate_rak
+
+import orjson
+
+from app.schemas.travel import Traveller, TravelInsuranceRequest
+from app.api.v1.endpoints.third_party.travel.base import InsurerAdapter
+from app.api.v1.endpoints.third_party.travel.errors import InsurerError
+from app.api.v1.endpoints.third_party.travel.mapping import CoverageSpec, compile_coverage_spec
+from app.api.v1.endpoints.third_party.travel.token_manager import token_manager
+from app.utils.metrics import stage
 
 
 # ---------------------------------------------------------------------------
@@ -14,176 +16,153 @@ from app.api.v1.endpoints.third_party.travel.auth import authenticate_rak
 
 RAK_RATING_URL = "https://uat-connect.rakinsurance.com/api/travel/gettravelrating"
 
-# RAK cover IDs used in our CDM mapping
-RAK_COVER_ID_MAP: Dict[str, str] = {
-    # Emergency block
-    "emergency_medical_amount": "1200",          # Emergency Medical Expenses
-    "delayed_departure_amount": "1211",          # Delayed Departure
-
-    # Accident block
-    "personal_accident_amount": "1219",          # Personal Accident / common carrier
-    "repatriation_expenses_amount": "1181",      # Repatriation of mortal remains
-
-    # Additional block
-    "personal_liability_amount": "1222",         # Personal Civil Liability
-    "delayed_baggage_amount": "1217",            # Delay of luggage
-    "loss_of_id_amount": "1212",                 # Loss of passport / ID documents
+# RAK cover IDs used in our CDM mapping, per coverage_summary section
+RAK_COVERAGE_SPEC: CoverageSpec = {
+    "emergency": {
+        "emergency_medical_amount": "1200",      # Emergency Medical Expenses
+        "delayed_departure_amount": "1211",      # Delayed Departure
+    },
+    "accident": {
+        "personal_accident_amount": "1219",      # Personal Accident / common carrier
+        "repatriation_expenses_amount": "1181",  # Repatriation of mortal remains
+    },
+    "additional": {
+        "personal_liability_amount": "1222",     # Personal Civil Liability
+        "delayed_baggage_amount": "1217",        # Delay of luggage
+        "loss_of_id_amount": "1212",             # Loss of passport / ID documents
+    },
 }
 
 
 # ---------------------------------------------------------------------------
-# Public entrypoint used by /get-quotes
+# RAK adapter used by /get-quotes
 # ---------------------------------------------------------------------------
 
-def get_rak_quotes(payload: TravelInsuranceRequest, db: Session) -> Dict[str, Any]:
-
-    # 1) canonical dict from Pydantic model
-    canonical_payload: Dict[str, Any] = payload.model_dump()
+class RakAdapter(InsurerAdapter):
+    code = "rak"
+    insurer = "RAK"
+    insurer_name = "RAK Insurance"
 
-    # 2) Build insurer request body
-    rak_request_body = build_rak_request(canonical_payload)
+    def build_request(self, payload: TravelInsuranceRequest) -> Dict[str, Any]:
+        # typed Pydantic model -> RAK request body (schema: RakRatingRequest)
+        return build_rak_request(payload)
 
-    token = get_rak_token(db)
+    async def call(self, request_body: Dict[str, Any]) -> Any:
+        with stage("token", self.code):
+            token = await get_rak_token()
+        if not token:
+            raise InsurerError("Failed to authenticate RAK")
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {token}"
+        }
 
-    # 4) Call RAK rating API
-    try:
-        response = requests.post(
+        response = await self.post_rating(
             RAK_RATING_URL,
-            json=rak_request_body,
+            content=orjson.dumps(request_body),
             headers=headers,
-            timeout=30,
         )
-    except Exception as exc:
-        return {
-            "insurer": "RAK",
-            "insurer_name": "RAK Insurance",
-            "plans": [],
-            "raw_insurer_response": None,
-            "error": f"Request to RAK failed: {exc}",
-        }
-
-    try:
-        real_quote = response.json()
-    except Exception:
-        real_quote = {"error": "Invalid JSON", "raw": response.text}
-
-    # 5) Extract plans from raw response
-    plans_raw = [
-        p
-        for p in real_quote
-        if isinstance(p, dict) and p.get("planName") and p.get("total") is not None
-    ]
 
-    # 6) Map each RAK plan -> canonical plan card
-    mapped_plans = [_map_plan_card(p) for p in plans_raw]
+        if response.status_code == 401:
+            # token revoked upstream; next quote forces a fresh login
+            token_manager.invalidate("rak")
 
-    return {
-        "insurer": "RAK",
-        "insurer_name": "RAK Insurance",
-        "plans": mapped_plans,
-        "error": None,
-    }
+        if response.status_code >= 400:
+            # an error body is not an empty plan list (and must not be cached as one)
+            raise InsurerError(f"RAK rating failed with HTTP {response.status_code}")
 
+        with stage("decode", self.code):
+            try:
+                plans = orjson.loads(response.content)
+            except orjson.JSONDecodeError:
+                # not an empty plan list either; must not be cached as one
+                raise InsurerError(f"RAK rating returned invalid JSON: {response.text[:200]!r}")
+        if not isinstance(plans, list):
+            raise InsurerError(f"RAK rating returned {type(plans).__name__}, expected a plan list")
+        return plans
 
-# ---------------------------------------------------------------------------
-# token provider
-# ---------------------------------------------------------------------------
+    def map_plans(self, raw_response: Any) -> List[Dict[str, Any]]:
+        # Extract plans from raw response, then map each -> canonical plan card
+        plans_raw = [
+            p
+            for p in raw_response
+            if isinstance(p, dict) and p.get("planName") and p.get("total") is not None
+        ]
+        return [_map_plan_card(p) for p in plans_raw]
 
-def get_rak_token(db: Session) -> str | None:
-    provider = (
-        db.query(ThirdPartyAuth)
-        .filter(ThirdPartyAuth.name.ilike("%rak%")) 
-        .first()
-    )
 
-    if not provider:
-        print("RAK provider not found in DB")
-        return None
-
-    token = authenticate_rak(db, provider)
+rak_adapter = RakAdapter()
 
-    if not token:
-        print("Failed to authenticate RAK")
-        return None
-    return provider.auth_config.get("token")
 
+async def get_rak_quotes(payload: TravelInsuranceRequest) -> Dict[str, Any]:
+    return await rak_adapter.get_quotes(payload)
 
 
 # ---------------------------------------------------------------------------
-# Request building (canonical -> RAK request)
+# token provider
 # ---------------------------------------------------------------------------
 
-def build_rak_request(canonical_payload: Dict[str, Any]) -> Dict[str, Any]:
-    travel = canonical_payload["travel_details"]
-    personal = canonical_payload["personal_details"]
+async def get_rak_token() -> str | None:
+    # served from memory; see token_manager for refresh behaviour
+    return await token_manager.get_token("rak")
 
-    # Dates and duration
-    start_iso = _to_iso_date(travel["travel_dates"]["start_date"])
-    end_iso = _to_iso_date(travel["travel_dates"]["end_date"])
-    trip_duration = _days_inclusive(start_iso, end_iso)
 
-    # Travellers
-    travellers = travel["travellers"]
-    traveller_info = _map_travellers_simple(travellers)
 
-    # Required UI fields
-    destination = travel["destination"]
-    departure = travel["departure"]
+# ---------------------------------------------------------------------------
+# Request building (canonical -> RAK request)
+# ---------------------------------------------------------------------------
+#
+# Read straight off the validated TravelInsuranceRequest: no model_dump() of
+# the whole payload and no ISO round trip for dates that Pydantic already
+# parsed. The builder emits the JSON-ready dict itself, since constructing and
+# dumping a model per quote costs more than the dict it replaces; the insurer
+# simulator checks every body it receives against RakRatingRequest
+# (app/schemas/travel.py).
+
+def build_rak_request(payload: TravelInsuranceRequest) -> Dict[str, Any]:
+    travel = payload.travel_details
+    personal = payload.personal_details
+
+    # Dates and duration (inclusive)
+    start_date = travel.travel_dates.start_date
+    end_date = travel.travel_dates.end_date
+    trip_duration = (end_date - start_date).days + 1
 
     # tripType mapping (Single vs Annual)
-    plan_type = str(travel.get("plan_type", "")).lower()
+    plan_type = travel.plan_type.lower()
     if "single" in plan_type:
         trip_type = "Single"
     elif "annual" in plan_type or "amt" in plan_type:
         trip_type = "Annual"
     else:
-        trip_type = travel.get("trip_type") or "Single"
+        trip_type = "Single"
 
     # cover_type -> traveller label
-    traveller_label = travel.get("cover_type") or (
-        "Individual" if len(travellers) == 1 else "Family"
+    traveller_label = travel.cover_type or (
+        "Individual" if len(travel.travellers) == 1 else "Family"
     )
 
-    # coverage amount (fallback to duration if not provided)
-    coverage = travel.get("coverage") or str(trip_duration)
-
-    # coverage type from UI
-    coverage_type = str(travel.get("coverage_type", "")).strip()
-
-    # travelType logic
-    if coverage_type.lower() == "uae inbound":
-        travel_type_value = "Inbound"
-    else:
-        travel_type_value = "Outbound"
-
-    # incWorldwide logic
-    inc_worldwide = coverage_type.lower() == "worldwide"
-
-    # Contact details
-    email = personal.get("email", "")
-    contact_no = personal.get("mobile_number", "")
+    # coverage type from UI: travelType and incWorldwide
+    coverage_type = travel.coverage_type.strip().lower()
 
     return {
-        "tripStartDate": start_iso,
-        "tripEndDate": end_iso,
+        "tripStartDate": start_date.isoformat(),
+        "tripEndDate": end_date.isoformat(),
         "tripDuration": trip_duration,
-        "travelType": travel_type_value,
-        "destination": destination,
-        "departure": departure,
+        "travelType": "Inbound" if coverage_type == "uae inbound" else "Outbound",
+        "destination": travel.destination,
+        "departure": travel.departure,
         "tripType": trip_type,
         "traveller": traveller_label,
-        "noOfTravellers": str(len(travellers)),
+        "noOfTravellers": str(len(travel.travellers)),
         "travelling": "Yes",
-        "coverage": str(coverage),
-        "incWorldwide": inc_worldwide,
-        "travellerInfo": traveller_info,
-        "email": email,
-        "contactNo": contact_no,
+        # the canonical request has no coverage amount; RAK takes the duration
+        "coverage": str(trip_duration),
+        "incWorldwide": coverage_type == "worldwide",
+        "travellerInfo": _map_travellers_simple(travel.travellers),
+        "email": str(personal.email),
+        "contactNo": personal.mobile_number,
     }
 
 
@@ -192,45 +171,13 @@ def build_rak_request(canonical_payload: Dict[str, Any]) -> Dict[str, Any]:
 # ---------------------------------------------------------------------------
 
 def _map_plan_card(plan: Dict[str, Any]) -> Dict[str, Any]:
-    plan_name = plan.get("planName")
-    premium_total = plan.get("total")
-
-    # Emergency block
-    em_med_amount = _map_amount_by_cdm_field(plan, "emergency_medical_amount")
-    delayed_dep_amount = _map_amount_by_cdm_field(plan, "delayed_departure_amount")
-
-    # Accident block
-    pa_amount = _map_amount_by_cdm_field(plan, "personal_accident_amount")
-    rep_amount = _map_amount_by_cdm_field(plan, "repatriation_expenses_amount")
-
-    # Additional block
-    additional_block = {
-        "personal_liability_amount": _map_amount_by_cdm_field(
-            plan, "personal_liability_amount"
-        ),
-        "delayed_baggage_amount": _map_amount_by_cdm_field(
-            plan, "delayed_baggage_amount"
-        ),
-        "loss_of_id_amount": _map_amount_by_cdm_field(plan, "loss_of_id_amount"),
-    }
-
     return {
         "insurer_code": "RAK",
         "insurer_name": "RAKINSURANCE",
-        "plan_name": plan_name,
+        "plan_name": plan.get("planName"),
         "currency": "AED",
-        "premium_total": premium_total,
-        "coverage_summary": {
-            "emergency": {
-                "emergency_medical_amount": em_med_amount,
-                "delayed_departure_amount": delayed_dep_amount,
-            },
-            "accident": {
-                "personal_accident_amount": pa_amount,
-                "repatriation_expenses_amount": rep_amount,
-            },
-            "additional": additional_block,
-        },
+        "premium_total": plan.get("total"),
+        "coverage_summary": RAK_COVERAGE_MAPPER.map(plan.get("covers")),
     }
 
 
@@ -238,22 +185,6 @@ def _map_plan_card(plan: Dict[str, Any]) -> Dict[str, Any]:
 # Low-level helpers
 # ---------------------------------------------------------------------------
 
-def _map_amount_by_cdm_field(plan: Dict[str, Any], cdm_field_name: str) -> Optional[str]:
-    cover_id = RAK_COVER_ID_MAP.get(cdm_field_name)
-    if not cover_id:
-        return None
-    cover = _find_cover(plan, cover_id)
-    return _extract_amount(cover)
-
-
-def _find_cover(plan: Dict[str, Any], cover_id: str) -> Optional[Dict[str, Any]]:
-    covers = plan.get("covers") or []
-    for c in covers:
-        if str(c.get("id")) == str(cover_id):
-            return c
-    return None
-
-
 def _extract_amount(cover: Optional[Dict[str, Any]]) -> Optional[str]:
     if not cover:
         return None
@@ -273,28 +204,21 @@ def _extract_amount(cover: Optional[Dict[str, Any]]) -> Optional[str]:
     return None
 
 
-def _to_iso_date(val: Any) -> str:
-    if isinstance(val, date):
-        return val.isoformat()
-    return str(val)
+# compiled once at import; see mapping.py
+RAK_COVERAGE_MAPPER = compile_coverage_spec(RAK_COVERAGE_SPEC, _extract_amount)
 
 
-def _days_inclusive(start_iso: str, end_iso: str) -> int:
-    start_date = datetime.fromisoformat(start_iso).date()
-    end_date = datetime.fromisoformat(end_iso).date()
-    return (end_date - start_date).days + 1
-
-
-def _map_travellers_simple(travellers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-
-    for t in travellers:
-        name = f"{t.get('first_name', '').strip()} {t.get('last_name', '').strip()}".strip()
-        dob = _to_iso_date(t.get("date_of_birth"))
-        relation = t.get("relation") or None
-        out.append({"name": name, "relation": relation, "dob": dob})
+def _map_travellers_simple(travellers: List[Traveller]) -> List[Dict[str, Any]]:
+    out = [
+        {
+            "name": f"{t.first_name.strip()} {t.last_name.strip()}".strip(),
+            "relation": None,
+            "dob": t.date_of_birth.isoformat(),
+        }
+        for t in travellers
+    ]
 
-    if len(out) == 1 and not out[0].get("relation"):
+    if len(out) == 1:
         out[0]["relation"] = "Self"
 
     return out
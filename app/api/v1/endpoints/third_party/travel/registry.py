@@ -0,0 +1,34 @@
+from typing import Dict, List, Optional
+
+from app.api.v1.endpoints.third_party.travel.base import InsurerAdapter
+from app.api.v1.endpoints.third_party.travel.rak import rak_adapter
+
+
+# ---------------------------------------------------------------------------
+# Insurer adapter registry
+# ---------------------------------------------------------------------------
+#
+# /get-quotes fans out over every adapter registered here. Gulf and Liva only
+# have auth handlers so far; register their adapters once their rating
+# integrations exist.
+
+_adapters: Dict[str, InsurerAdapter] = {}
+
+
+def register_adapter(adapter: InsurerAdapter) -> None:
+    _adapters[adapter.code] = adapter
+
+
+def unregister_adapter(code: str) -> None:
+    _adapters.pop(code, None)
+
+
+def get_adapter(code: str) -> Optional[InsurerAdapter]:
+    return _adapters.get(code)
+
+
+def get_adapters() -> List[InsurerAdapter]:
+    return list(_adapters.values())
+
+
+register_adapter(rak_adapter)
@@ -0,0 +1,250 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.api.v1.endpoints.third_party.travel.errors import CircuitOpenError
+
+
+# ---------------------------------------------------------------------------
+# Per-insurer circuit breaker with adaptive timeouts and optional hedging
+# ---------------------------------------------------------------------------
+#
+# One circuit per insurer operation ("rak:rating", "gulf:auth", ...). Each
+# keeps a rolling window of the last N calls (outcome + latency):
+#
+#   closed     calls flow; once the window holds min_calls and the failure
+#              rate reaches the threshold the circuit opens
+#   open       calls fail fast with CircuitOpenError for open_seconds
+#   half_open  a limited number of probe calls go through; a success closes
+#              the circuit, a failure re-opens it
+#
+# The per-call timeout is derived from the observed p95 latency (times a
+# multiplier, clamped to [min, max]) instead of a fixed 30s. With hedging on,
+# a second identical request is sent when the first is slower than the p95 and
+# whichever finishes first wins. The hedge is extra upstream load, so it first
+# takes its own outbound slot through hedge_slot; when none is free right
+# away it is skipped rather than queued.
+
+AttemptFn = Callable[[float], Awaitable[Any]]
+FailureFn = Callable[[Any], bool]
+# takes a slot without waiting: returns its release function, or None
+HedgeSlotFn = Callable[[], Optional[Callable[[], None]]]
+
+
+def is_failed_response(response: Any) -> bool:
+    # upstream trouble, as opposed to a well-formed rejection of our request
+    return isinstance(response, httpx.Response) and (
+        response.status_code >= 500 or response.status_code == 429
+    )
+
+
+class InsurerCircuit:
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int,
+        min_calls: int,
+        failure_rate: float,
+        open_seconds: float,
+        half_open_calls: int,
+        timeout_multiplier: float,
+        min_timeout: float,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+
+        self.state = self.CLOSED
+        self._window: Deque[Tuple[bool, float]] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes = 0
+        self.rejected = 0
+        self.hedged = 0
+        self.hedges_skipped = 0
+
+    # -- window statistics --------------------------------------------------
+
+    def failure_rate(self) -> float:
+        if not self._window:
+            return 0.0
+        return sum(1 for ok, _ in self._window if not ok) / len(self._window)
+
+    def p95(self) -> Optional[float]:
+        if len(self._window) < self.min_calls:
+            return None
+        latencies = sorted(latency for _, latency in self._window)
+        return latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+    def timeout(self, max_timeout: float) -> float:
+        p95 = self.p95()
+        if p95 is None:
+            return max_timeout
+        return min(max_timeout, max(self.min_timeout, p95 * self.timeout_multiplier))
+
+    def status(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        return {
+            "state": self.state,
+            "calls": len(self._window),
+            "failure_rate": round(self.failure_rate(), 3),
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "rejected": self.rejected,
+            "hedged": self.hedged,
+            "hedges_skipped": self.hedges_skipped,
+        }
+
+    # -- state machine ------------------------------------------------------
+
+    def _before_call(self) -> None:
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(
+                    f"{self.name} circuit open, retry in {remaining:.0f}s"
+                )
+            self.state = self.HALF_OPEN
+            self._probes = 0
+
+        if self.state == self.HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} circuit half-open, probe in progress")
+            self._probes += 1
+
+    def _record(self, ok: bool, latency: float) -> None:
+        if self.state == self.HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+            if ok:
+                self.state = self.CLOSED
+                self._window.clear()
+            else:
+                self._open()
+            self._window.append((ok, latency))
+            return
+
+        self._window.append((ok, latency))
+        if (
+            self.state == self.CLOSED
+            and len(self._window) >= self.min_calls
+            and self.failure_rate() >= self.failure_rate_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        print(f"[CIRCUIT] {self.name} opened (failure rate {self.failure_rate():.0%})")
+
+    # -- calls --------------------------------------------------------------
+
+    async def call(
+        self,
+        attempt: AttemptFn,
+        max_timeout: float,
+        hedge: bool = False,
+        is_failure: FailureFn = is_failed_response,
+        hedge_slot: Optional[HedgeSlotFn] = None,
+    ) -> Any:
+        self._before_call()
+        timeout = self.timeout(max_timeout)
+        started = time.monotonic()
+
+        try:
+            if hedge:
+                result = await self._hedged(attempt, timeout, is_failure, hedge_slot)
+            else:
+                result = await attempt(timeout)
+        except asyncio.CancelledError:
+            # the caller gave up (deadline, disconnect): says nothing about the insurer
+            if self.state == self.HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+            raise
+        except Exception:
+            self._record(False, time.monotonic() - started)
+            raise
+
+        self._record(not is_failure(result), time.monotonic() - started)
+        return result
+
+    async def _hedged(
+        self,
+        attempt: AttemptFn,
+        timeout: float,
+        is_failure: FailureFn,
+        hedge_slot: Optional[HedgeSlotFn],
+    ) -> Any:
+        delay = self.p95()
+        first = asyncio.create_task(attempt(timeout))
+        if delay is None or delay >= timeout:
+            return await first
+
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                release = hedge_slot() if hedge_slot is not None else None
+                if hedge_slot is not None and release is None:
+                    # no outbound slot free: a hedge now would only add load
+                    self.hedges_skipped += 1
+                else:
+                    self.hedged += 1
+                    hedge = asyncio.create_task(attempt(timeout - delay))
+                    if release is not None:
+                        # also runs if the hedge is cancelled before it started
+                        hedge.add_done_callback(lambda _: release())
+                    tasks.append(hedge)
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and not is_failure(task.result()):
+                        return task.result()
+
+            # every attempt failed: surface the first one's outcome
+            return first.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+_circuits: Dict[str, InsurerCircuit] = {}
+
+
+def get_circuit(name: str) -> InsurerCircuit:
+    circuit = _circuits.get(name)
+    if circuit is None:
+        circuit = InsurerCircuit(
+            name,
+            window_size=settings.INSURER_CIRCUIT_WINDOW,
+            min_calls=settings.INSURER_CIRCUIT_MIN_CALLS,
+            failure_rate=settings.INSURER_CIRCUIT_FAILURE_RATE,
+            open_seconds=settings.INSURER_CIRCUIT_OPEN_SECONDS,
+            half_open_calls=settings.INSURER_CIRCUIT_HALF_OPEN_CALLS,
+            timeout_multiplier=settings.INSURER_TIMEOUT_P95_MULTIPLIER,
+            min_timeout=settings.INSURER_TIMEOUT_MIN_SECONDS,
+        )
+        _circuits[name] = circuit
+    return circuit
+
+
+def circuits_status() -> Dict[str, Dict[str, Any]]:
+    return {name: circuit.status() for name, circuit in _circuits.items()}
+
+
+def reset_circuits() -> None:
+    _circuits.clear()
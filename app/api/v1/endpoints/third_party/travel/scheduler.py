@@ -0,0 +1,225 @@
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from app.core.config import settings
+from app.api.v1.endpoints.third_party.travel.errors import InsurerQueueTimeout
+from app.utils.metrics import INSURER_QUEUE_TIMEOUTS_TOTAL, INSURER_QUEUE_WAIT_SECONDS
+from app.utils.waiters import WaitQueue
+
+
+# ---------------------------------------------------------------------------
+# Outbound scheduler shared by the insurer adapters
+# ---------------------------------------------------------------------------
+#
+# Every auth and rating call takes a slot from its insurer's limiter first: a
+# token bucket (rate / burst) plus a cap on calls in flight. Callers that
+# cannot start immediately queue by priority, then arrival order, so
+# interactive /get-quotes traffic overtakes batch quoting. Nobody waits longer
+# than max_wait; InsurerQueueTimeout is raised instead and shows up as
+# "queue_timeout" in the SSE event.
+#
+# The priority comes from a context variable, so it follows the request into
+# the tasks it spawns; batch and background code mark themselves with
+# priority() / set_priority(). A task that a more urgent caller ends up
+# waiting on (a background token refresh that a quote now needs) is raised
+# to that caller's level with promote(), including calls it already queued.
+
+INTERACTIVE = 0
+BATCH = 1
+BACKGROUND = 2
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch", BACKGROUND: "background"}
+
+_priority: ContextVar[int] = ContextVar("outbound_priority", default=INTERACTIVE)
+_promoted: "weakref.WeakKeyDictionary[asyncio.Task, int]" = weakref.WeakKeyDictionary()
+
+
+def current_priority() -> int:
+    level = _priority.get()
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        return level
+    return min(level, _promoted.get(task, level))
+
+
+def set_priority(level: int) -> None:
+    # for code that owns its task (warm-up, timers)
+    _priority.set(level)
+
+
+def promote(task: asyncio.Task, level: int) -> None:
+    if level >= _promoted.get(task, BACKGROUND + 1):
+        return
+    _promoted[task] = level
+    for limiter in _limiters.values():
+        limiter.promote(task, level)
+
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class InsurerLimiter:
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int,
+        max_concurrency: int,
+        max_wait: float,
+    ):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+
+        self.tokens = float(self.burst)
+        self.active = 0
+        self._updated = time.monotonic()
+        self._queue = WaitQueue()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.timeouts = 0
+
+    # -- token bucket -------------------------------------------------------
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.rate <= 0:
+            self.tokens = float(self.burst)
+        else:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _blocked(self) -> bool:
+        if self.active >= self.max_concurrency:
+            return True
+        self._refill()
+        return self.tokens < 1
+
+    def _try_take(self) -> bool:
+        if self._blocked():
+            return False
+        self.tokens -= 1
+        self.active += 1
+        return True
+
+    def _dispatch(self) -> None:
+        # every waiter needs the same kind of slot, so the queue stops at the
+        # first one that cannot start
+        self._queue.dispatch(lambda _: self._try_take(), self._blocked)
+
+        # blocked on the bucket rather than on concurrency: wake up once the
+        # next token has accrued (releases wake us otherwise)
+        loop = asyncio.get_running_loop()
+        timer_pending = self._timer is not None and self._timer_loop is loop
+        if len(self._queue) and self.active < self.max_concurrency and not timer_pending:
+            delay = max(0.0, (1 - self.tokens) / self.rate) if self.rate > 0 else 0.0
+            self._timer = loop.call_later(delay, self._on_timer)
+            self._timer_loop = loop
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    # -- slots --------------------------------------------------------------
+
+    async def acquire(self, level: int = INTERACTIVE, max_wait: Optional[float] = None) -> float:
+        if not len(self._queue) and self._try_take():
+            return 0.0
+
+        waiter = self._queue.push(priority=level)
+        self._dispatch()
+
+        started = time.monotonic()
+        wait = self.max_wait if max_wait is None else max_wait
+        try:
+            await self._queue.wait(waiter, wait, self.release)
+        except TimeoutError:
+            self.timeouts += 1
+            raise InsurerQueueTimeout(
+                f"{self.name} is rate limited; no slot within {wait:g}s"
+            ) from None
+        return time.monotonic() - started
+
+    def try_acquire(self) -> bool:
+        # a slot only if one is free now and nobody is queued for it
+        return not len(self._queue) and self._try_take()
+
+    def release(self) -> None:
+        self.active -= 1
+        self._dispatch()
+
+    def promote(self, task: asyncio.Task, level: int) -> None:
+        if self._queue.promote(task, level):
+            self._dispatch()
+
+    def status(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "active": self.active,
+            "waiting": self._queue.waiting(),
+            "tokens": round(self.tokens, 2),
+            "timeouts": self.timeouts,
+        }
+
+
+_limiters: Dict[str, InsurerLimiter] = {}
+
+
+def get_limiter(insurer: str) -> InsurerLimiter:
+    limiter = _limiters.get(insurer)
+    if limiter is None:
+        override = settings.INSURER_LIMIT_OVERRIDES.get(insurer, {})
+        limiter = InsurerLimiter(
+            insurer,
+            rate=override.get("rate", settings.INSURER_RATE_PER_SECOND),
+            burst=int(override.get("burst", settings.INSURER_RATE_BURST)),
+            max_concurrency=int(override.get("concurrency", settings.INSURER_MAX_CONCURRENCY)),
+            max_wait=override.get("max_wait", settings.INSURER_QUEUE_MAX_WAIT_SECONDS),
+        )
+        _limiters[insurer] = limiter
+    return limiter
+
+
+@asynccontextmanager
+async def outbound(insurer: str) -> AsyncIterator[None]:
+    limiter = get_limiter(insurer)
+    level = current_priority()
+    labels = {"insurer": insurer, "priority": PRIORITY_NAMES.get(level, str(level))}
+    try:
+        waited = await limiter.acquire(level)
+    except InsurerQueueTimeout:
+        INSURER_QUEUE_TIMEOUTS_TOTAL.inc(**labels)
+        raise
+    INSURER_QUEUE_WAIT_SECONDS.observe(waited, **labels)
+    try:
+        yield
+    finally:
+        limiter.release()
+
+
+def try_outbound(insurer: str) -> Optional[Callable[[], None]]:
+    # non-blocking slot for optional extra calls (hedges); None when busy
+    limiter = get_limiter(insurer)
+    return limiter.release if limiter.try_acquire() else None
+
+
+def limiters_status() -> Dict[str, Dict[str, Any]]:
+    return {name: limiter.status() for name, limiter in _limiters.items()}
+
+
+def reset_limiters() -> None:
+    _limiters.clear()
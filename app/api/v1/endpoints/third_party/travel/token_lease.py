@@ -0,0 +1,158 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.third_party_api import ThirdPartyAuth
+
+
+# ---------------------------------------------------------------------------
+# Cluster-wide token refresh lease on the third_party_auth row
+# ---------------------------------------------------------------------------
+#
+# Exactly one worker (across processes and pods) logs in for a provider at a
+# time; the others wait and read the token it writes back.
+#
+# The lease is an owner + expiry stamped into auth_config by one short
+# transaction, and cleared by another one that also writes the new token. No
+# connection or transaction is held during the login itself, and a crashed
+# holder cannot block refreshes beyond lease_seconds.
+#
+#   postgresql  SELECT ... FOR UPDATE on the row, check and stamp, commit
+#   others      (SQLite in dev) a single conditional UPDATE; SQLite has no
+#               row locks, and pysqlite would not open the transaction
+#               before the SELECT anyway
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+LEASE_OWNER = "refresh_lease_owner"
+LEASE_UNTIL = "refresh_lease_until"
+
+
+def without_lease(auth_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {k: v for k, v in (auth_config or {}).items() if k not in (LEASE_OWNER, LEASE_UNTIL)}
+
+
+class Lease:
+
+    def __init__(self, provider_id: int, auth_config: Dict[str, Any]):
+        self.provider_id = provider_id
+        # the row as seen once the lease was taken
+        self.auth_config = without_lease(auth_config)
+        self.published: Optional[Dict[str, Any]] = None
+
+    def publish(self, auth_config: Dict[str, Any]) -> None:
+        # written back when the lease is released
+        self.published = without_lease(auth_config)
+
+
+class TokenLease:
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        lease_seconds: float = 60.0,
+        poll_interval: float = 0.2,
+        row_locks: Optional[bool] = None,
+    ):
+        self._session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        # None: SELECT ... FOR UPDATE on Postgres, conditional UPDATE elsewhere
+        self.row_locks = row_locks
+
+    @asynccontextmanager
+    async def hold(self, provider_id: int) -> AsyncIterator[Optional[Lease]]:
+        # yields a Lease, or None while another worker holds it
+        async with self._session_factory() as db:
+            auth_config = await self._stamp(db, provider_id)
+        if auth_config is None:
+            yield None
+            return
+
+        lease = Lease(provider_id, auth_config)
+        try:
+            yield lease
+        finally:
+            async with self._session_factory() as db:
+                await self._release(db, lease)
+
+    def _row_locks(self, db: AsyncSession) -> bool:
+        if self.row_locks is not None:
+            return self.row_locks
+        return db.get_bind().dialect.name == "postgresql"
+
+    async def _stamp(self, db: AsyncSession, provider_id: int) -> Optional[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        until = (now + timedelta(seconds=self.lease_seconds)).isoformat()
+
+        if self._row_locks(db):
+            async with db.begin():
+                row = await db.scalar(
+                    select(ThirdPartyAuth).where(ThirdPartyAuth.id == provider_id).with_for_update()
+                )
+                if row is None:
+                    return None
+                auth_config = dict(row.auth_config or {})
+                held_until = auth_config.get(LEASE_UNTIL)
+                if held_until is not None and held_until >= now.isoformat():
+                    return None
+                row.auth_config = {**auth_config, LEASE_OWNER: WORKER_ID, LEASE_UNTIL: until}
+            return auth_config
+
+        result = await db.execute(
+            text(
+                "UPDATE third_party_auth SET auth_config = json_set(auth_config, "
+                f"'$.{LEASE_OWNER}', :owner, '$.{LEASE_UNTIL}', :until) "
+                f"WHERE id = :id AND (json_extract(auth_config, '$.{LEASE_UNTIL}') IS NULL "
+                f"OR json_extract(auth_config, '$.{LEASE_UNTIL}') < :now)"
+            ),
+            {"owner": WORKER_ID, "until": until, "now": now.isoformat(), "id": provider_id},
+        )
+        await db.commit()
+        if result.rowcount != 1:
+            return None
+        row = await db.get(ThirdPartyAuth, provider_id, populate_existing=True)
+        return dict(row.auth_config or {})
+
+    async def _release(self, db: AsyncSession, lease: Lease) -> None:
+        # writing the row back without the lease fields releases it; only if
+        # it is still ours (it may have expired and been taken over)
+        async with db.begin():
+            query = select(ThirdPartyAuth).where(ThirdPartyAuth.id == lease.provider_id)
+            if self._row_locks(db):
+                query = query.with_for_update()
+            row = await db.scalar(query)
+            if row is None or (row.auth_config or {}).get(LEASE_OWNER) != WORKER_ID:
+                return
+            if lease.published is not None:
+                row.auth_config = lease.published
+            else:
+                row.auth_config = without_lease(row.auth_config)
+
+    async def wait_for(
+        self,
+        provider_id: int,
+        is_fresh: Callable[[Dict[str, Any]], bool],
+        timeout: float,
+    ) -> Optional[Dict[str, Any]]:
+        # poll the row until the lease holder has written a usable token
+        deadline = time.monotonic() + timeout
+        while True:
+            async with self._session_factory() as db:
+                auth_config = await db.scalar(
+                    select(ThirdPartyAuth.auth_config).where(ThirdPartyAuth.id == provider_id)
+                )
+            auth_config = without_lease(auth_config)
+            if is_fresh(auth_config):
+                return auth_config
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(self.poll_interval)
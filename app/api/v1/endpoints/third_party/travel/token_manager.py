@@ -0,0 +1,342 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.third_party_api import ThirdPartyAuth
+from app.db.session import SessionLocal
+from app.api.v1.endpoints.third_party.travel.auth import (
+    TOKEN_FIELDS,
+    authenticate_provider,
+    provider_key,
+    token_expires_at,
+)
+from app.api.v1.endpoints.third_party.travel.token_lease import TokenLease
+from app.api.v1.endpoints.third_party.travel.scheduler import (
+    BACKGROUND,
+    current_priority,
+    priority,
+    promote,
+    set_priority,
+)
+from app.utils.metrics import TOKEN_REFRESH_TOTAL
+
+
+# ---------------------------------------------------------------------------
+# Process-wide insurer token cache
+# ---------------------------------------------------------------------------
+#
+# Tokens are served from memory until their real `token_expires_at`. Once a
+# token enters the refresh margin it is renewed in the background (a timer is
+# armed as soon as the token is stored), and concurrent refreshes for the same
+# insurer share one outbound login. The DB is only touched to load provider
+# credentials once and to persist freshly issued tokens.
+#
+# Across workers, a refresh first takes the provider's lease (token_lease.py):
+# the holder logs in and writes the token back, everyone else waits for that
+# token instead of logging in too. If the holder does not deliver within
+# INSURER_TOKEN_LEASE_WAIT_SECONDS (or the DB is unavailable), the worker logs
+# in on its own rather than fail the quote.
+
+
+@dataclass
+class CachedToken:
+    value: str
+    expires_at: datetime
+
+
+class TokenManager:
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AsyncSession]] = SessionLocal,
+        refresh_margin: Optional[timedelta] = None,
+        retry_after: Optional[float] = None,
+        lease: Optional[TokenLease] = None,
+        lease_wait: Optional[float] = None,
+    ):
+        self._session_factory = session_factory
+        if lease is None and session_factory is not None:
+            lease = TokenLease(
+                session_factory,
+                lease_seconds=settings.INSURER_TOKEN_LEASE_SECONDS,
+                poll_interval=settings.INSURER_TOKEN_LEASE_POLL_SECONDS,
+            )
+        self._lease = lease
+        self._lease_wait = (
+            lease_wait if lease_wait is not None else settings.INSURER_TOKEN_LEASE_WAIT_SECONDS
+        )
+        self._refresh_margin = refresh_margin or timedelta(
+            seconds=settings.INSURER_TOKEN_REFRESH_MARGIN_SECONDS
+        )
+        self._retry_after = (
+            retry_after if retry_after is not None else settings.INSURER_TOKEN_RETRY_SECONDS
+        )
+        self._providers: Dict[str, ThirdPartyAuth] = {}
+        self._tokens: Dict[str, CachedToken] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._renewals: Dict[str, asyncio.Task] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        # last token the insurer rejected; never adopted back from the DB
+        self._rejected: Dict[str, str] = {}
+        self._warm_up_task: Optional[asyncio.Task] = None
+
+    # -- public API ---------------------------------------------------------
+
+    async def get_token(self, insurer: str) -> Optional[str]:
+        cached = self._tokens.get(insurer)
+        now = datetime.now(timezone.utc)
+
+        if cached is not None and now < cached.expires_at:
+            if now + self._refresh_margin >= cached.expires_at:
+                # still usable: renew behind the caller's back
+                self._refresh(insurer)
+            return cached.value
+
+        task = self._refresh(insurer)
+        # the refresh runs at the priority of whoever started it (warm-up,
+        # renewal, a batch); now that we wait on it, it runs at ours
+        promote(task, current_priority())
+        return await asyncio.shield(task)
+
+    def invalidate(self, insurer: str) -> None:
+        cached = self._tokens.pop(insurer, None)
+        if cached is not None:
+            self._rejected[insurer] = cached.value
+
+    def add_provider(self, provider: ThirdPartyAuth) -> None:
+        key = provider_key(provider)
+        if key is None:
+            print(f"[TOKEN] No auth handler found for: {provider.name}")
+            return
+        self._providers[key] = provider
+        self._status.setdefault(key, {"state": "pending", "error": None, "updated_at": None})
+
+        # reuse a token persisted by an earlier run while it is still valid
+        token = (provider.auth_config or {}).get(TOKEN_FIELDS[key])
+        expires_at = token_expires_at(provider.auth_config)
+        if token and expires_at and datetime.now(timezone.utc) < expires_at:
+            self._store(key, CachedToken(token, expires_at))
+
+    async def warm_up(self) -> None:
+        await self._load_providers()
+        # logins for warm-up queue behind interactive insurer calls
+        with priority(BACKGROUND):
+            await asyncio.gather(
+                *(self.get_token(key) for key in list(self._providers)),
+                return_exceptions=True,
+            )
+
+    def start_warm_up(self) -> asyncio.Task:
+        # logins run concurrently in the background; see status()
+        if self._warm_up_task is None or self._warm_up_task.done():
+            self._warm_up_task = asyncio.create_task(self.warm_up())
+        return self._warm_up_task
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        for insurer, status in self._status.items():
+            cached = self._tokens.get(insurer)
+            out[insurer] = {
+                **status,
+                "token_expires_at": cached.expires_at.isoformat() if cached else None,
+            }
+        return out
+
+    async def close(self) -> None:
+        tasks: List[asyncio.Task] = [*self._renewals.values(), *self._inflight.values()]
+        if self._warm_up_task is not None:
+            tasks.append(self._warm_up_task)
+            self._warm_up_task = None
+        self._renewals.clear()
+        self._inflight.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def reset(self) -> None:
+        # forget every provider and token (tests); tasks still referenced here
+        # belong to an event loop that is already gone
+        self._providers.clear()
+        self._tokens.clear()
+        self._rejected.clear()
+        self._status.clear()
+        self._inflight.clear()
+        self._renewals.clear()
+        self._warm_up_task = None
+
+    # -- refresh ------------------------------------------------------------
+
+    def _refresh(self, insurer: str) -> asyncio.Task:
+        task = self._inflight.get(insurer)
+        if task is None:
+            task = asyncio.create_task(self._do_refresh(insurer))
+            self._inflight[insurer] = task
+
+            def _done(t: asyncio.Task) -> None:
+                if self._inflight.get(insurer) is t:
+                    del self._inflight[insurer]
+
+            task.add_done_callback(_done)
+        return task
+
+    async def _do_refresh(self, insurer: str) -> Optional[str]:
+        if insurer not in self._providers:
+            await self._load_providers()
+
+        provider = self._providers.get(insurer)
+        if provider is None:
+            print(f"[TOKEN] {insurer} provider not found in DB")
+            return None
+
+        # add_provider may just have loaded a token that is still fresh
+        cached = self._tokens.get(insurer)
+        if cached is not None and datetime.now(timezone.utc) + self._refresh_margin < cached.expires_at:
+            return cached.value
+
+        if self._lease is None or provider.id is None:
+            result, error = await self._login(insurer, provider, persist=True)
+        else:
+            try:
+                result, error = await self._coordinated_login(insurer, provider)
+            except Exception as exc:
+                print(f"[TOKEN] Refresh lease unavailable for {insurer}: {exc}")
+                result, error = await self._login(insurer, provider, persist=True)
+
+        token = (provider.auth_config or {}).get(TOKEN_FIELDS[insurer])
+        expires_at = token_expires_at(provider.auth_config)
+
+        if result == "failed" or not token or expires_at is None:
+            TOKEN_REFRESH_TOTAL.inc(insurer=insurer, result="failed")
+            self._schedule_renewal(insurer, self._retry_after)
+            # keep serving the previous token while it has not expired
+            if cached is not None and datetime.now(timezone.utc) < cached.expires_at:
+                self._set_status(insurer, "ready", error or "refresh failed, serving previous token")
+                return cached.value
+            self._set_status(insurer, "failed", error or "login rejected")
+            return None
+
+        TOKEN_REFRESH_TOTAL.inc(insurer=insurer, result=result)
+        self._store(insurer, CachedToken(token, expires_at))
+        return token
+
+    async def _login(
+        self,
+        insurer: str,
+        provider: ThirdPartyAuth,
+        persist: bool = False,
+    ) -> Tuple[str, Optional[str]]:
+        try:
+            data = await authenticate_provider(provider)
+        except Exception as exc:
+            print(f"[TOKEN] Refresh failed for {insurer}: {exc}")
+            return "failed", str(exc)
+        if data is None:
+            return "failed", "login rejected"
+        if persist:
+            await self._persist(provider)
+        return "ok", None
+
+    async def _coordinated_login(self, insurer: str, provider: ThirdPartyAuth) -> Tuple[str, Optional[str]]:
+        # "ok" (logged in, token published by the lease), "shared" (another
+        # worker's token adopted) or "failed"
+        def is_fresh(auth_config: Dict[str, Any]) -> bool:
+            token = auth_config.get(TOKEN_FIELDS[insurer])
+            expires_at = token_expires_at(auth_config)
+            return (
+                bool(token)
+                and token != self._rejected.get(insurer)
+                and expires_at is not None
+                and datetime.now(timezone.utc) + self._refresh_margin < expires_at
+            )
+
+        def adopt(auth_config: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+            provider.auth_config = {**(provider.auth_config or {}), **auth_config}
+            return "shared", None
+
+        deadline = time.monotonic() + self._lease_wait
+        while True:
+            async with self._lease.hold(provider.id) as lease:
+                if lease is not None:
+                    # another worker may have refreshed just before we got the lease
+                    if is_fresh(lease.auth_config):
+                        return adopt(lease.auth_config)
+                    result, error = await self._login(insurer, provider)
+                    if result == "ok":
+                        lease.publish(dict(provider.auth_config))
+                    return result, error
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # wait for the holder's token; retry the lease in case it gave up
+            auth_config = await self._lease.wait_for(provider.id, is_fresh, min(remaining, 1.0))
+            if auth_config is not None:
+                return adopt(auth_config)
+
+        print(f"[TOKEN] No token from the {insurer} refresh lease holder, logging in directly")
+        return await self._login(insurer, provider, persist=True)
+
+    def _store(self, insurer: str, cached: CachedToken) -> None:
+        self._tokens[insurer] = cached
+        self._set_status(insurer, "ready")
+        delay = (
+            cached.expires_at - self._refresh_margin - datetime.now(timezone.utc)
+        ).total_seconds()
+        self._schedule_renewal(insurer, max(delay, 0.0))
+
+    def _set_status(self, insurer: str, state: str, error: Optional[str] = None) -> None:
+        self._status[insurer] = {
+            "state": state,
+            "error": error,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def _schedule_renewal(self, insurer: str, delay: float) -> None:
+        previous = self._renewals.pop(insurer, None)
+        if previous is not None:
+            previous.cancel()
+
+        async def _renew() -> None:
+            set_priority(BACKGROUND)
+            await asyncio.sleep(delay)
+            await asyncio.shield(self._refresh(insurer))
+
+        self._renewals[insurer] = asyncio.create_task(_renew())
+
+    # -- persistence --------------------------------------------------------
+
+    async def _load_providers(self) -> None:
+        if self._session_factory is None:
+            return
+        try:
+            async with self._session_factory() as db:
+                result = await db.execute(select(ThirdPartyAuth))
+                providers = result.scalars().all()
+        except Exception as exc:
+            print(f"[TOKEN] Could not load providers: {exc}")
+            return
+        # detached once the session closes; auth_config is already loaded
+        for provider in providers:
+            if provider_key(provider) not in self._providers:
+                self.add_provider(provider)
+
+    async def _persist(self, provider: ThirdPartyAuth) -> None:
+        if self._session_factory is None:
+            return
+        try:
+            async with self._session_factory() as db:
+                row = await db.get(ThirdPartyAuth, provider.id)
+                if row is not None:
+                    row.auth_config = dict(provider.auth_config)
+                    await db.commit()
+        except Exception as exc:
+            print(f"[TOKEN] Could not persist token for {provider.name}: {exc}")
+
+
+token_manager = TokenManager()
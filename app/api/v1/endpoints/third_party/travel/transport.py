@@ -0,0 +1,104 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.utils.metrics import observe_upstream
+
+
+# ---------------------------------------------------------------------------
+# Shared async transport for every insurer integration
+# ---------------------------------------------------------------------------
+#
+# One keep-alive connection pool per insurer host, created lazily on first use
+# and closed from the app lifespan. Timeouts are split per phase (connect /
+# read / write / pool) and the whole exchange is additionally bounded by a
+# total deadline, which httpx does not provide on its own.
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+# set by tests and benchmarks to route every insurer call in-process
+_transport_override: Optional[httpx.AsyncBaseTransport] = None
+
+
+def set_transport(override: Optional[httpx.AsyncBaseTransport]) -> None:
+    global _transport_override
+    _transport_override = override
+    # pooled clients are bound to the previous transport
+    _clients.clear()
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.INSURER_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.INSURER_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.INSURER_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def _phase_timeouts() -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=settings.INSURER_HTTP_CONNECT_TIMEOUT,
+        read=settings.INSURER_HTTP_READ_TIMEOUT,
+        write=settings.INSURER_HTTP_WRITE_TIMEOUT,
+        pool=settings.INSURER_HTTP_POOL_TIMEOUT,
+    )
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def get_client(url: str) -> httpx.AsyncClient:
+    key = _host_key(url)
+    client = _clients.get(key)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=_pool_limits(),
+            timeout=_phase_timeouts(),
+            transport=_transport_override,
+        )
+        _clients[key] = client
+    return client
+
+
+async def request(
+    method: str,
+    url: str,
+    *,
+    total_timeout: Optional[float] = None,
+    insurer: Optional[str] = None,
+    operation: str = "request",
+    **kwargs: Any,
+) -> httpx.Response:
+    client = get_client(url)
+    deadline = total_timeout if total_timeout is not None else settings.INSURER_HTTP_TOTAL_TIMEOUT
+    started = time.perf_counter()
+    status = "error"
+    try:
+        async with asyncio.timeout(deadline):
+            response = await client.request(method, url, **kwargs)
+        status = str(response.status_code)
+        return response
+    except TimeoutError:
+        status = "timeout"
+        raise
+    except asyncio.CancelledError:
+        status = "cancelled"
+        raise
+    finally:
+        observe_upstream(insurer, operation, status, time.perf_counter() - started)
+
+
+async def post(url: str, **kwargs: Any) -> httpx.Response:
+    return await request("POST", url, **kwargs)
+
+
+async def close_clients() -> None:
+    clients = list(_clients.values())
+    _clients.clear()
+    await asyncio.gather(*(c.aclose() for c in clients), return_exceptions=True)
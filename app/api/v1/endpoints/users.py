@@ -1,20 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.schemas.user import TokenResponse, UserCreate, UserRead
+import csv
+import io
+from typing import Any, AsyncIterator, Dict, List, Literal
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.session import SessionLocal, get_db
+from app.schemas.user import TokenResponse, UserCreate, UserPage, UserRead
 from app.services.user_service import UserService
-from app.utils.password import get_password_hash, verify_password
-from app.utils.security import create_access_token
+from app.utils.password import PasswordHasherBusy, get_password_hash_async, verify_password_async
+from app.utils.security import create_access_token, verify_access_token
 
 router = APIRouter()
 
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many concurrent sign-ins, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/register", response_model=TokenResponse)
-def create_user(payload: UserCreate, db: Session = Depends(get_db)):
-    existing = UserService.get_user_by_email(db, payload.email)
+async def create_user(payload: UserCreate, db: AsyncSession = Depends(get_db)):
+    existing = await UserService.get_user_by_email(db, payload.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    user = UserService.create_user(db, payload)
+    try:
+        hashed_password = await get_password_hash_async(payload.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    user = await UserService.create_user(db, payload, hashed_password)
     access_token = create_access_token({"sub": user.email})
 
     return {
@@ -24,9 +44,13 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db)):
     }
 
 @router.post('/login', response_model=TokenResponse)
-def login_user(payload: UserCreate, db: Session = Depends(get_db)):
-    user = UserService.get_user_by_email(db, payload.email)
-    if not user or not verify_password(payload.password, user.hashed_password):
+async def login_user(payload: UserCreate, db: AsyncSession = Depends(get_db)):
+    user = await UserService.get_user_by_email(db, payload.email)
+    try:
+        valid = bool(user) and await verify_password_async(payload.password, user.hashed_password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    if not valid:
         raise HTTPException(
             status_code=400,
             detail="Invalid email or password"
@@ -41,8 +65,61 @@ def login_user(payload: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/user/{user_id}", response_model=UserRead)
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = UserService.get_user_by_id(db, user_id)
+async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
+    user = await UserService.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(404, "User not found")
     return user
+
+
+@router.get("", response_model=UserPage, dependencies=[Depends(verify_access_token)])
+async def list_users(
+    after: int | None = Query(None, description="next_after from the previous page"),
+    limit: int = Query(100, ge=1, le=settings.USERS_PAGE_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+):
+    # one extra row tells us whether another page exists
+    users = await UserService.get_all_users(db, after_id=after, limit=limit + 1)
+    items = users[:limit]
+    next_after = items[-1].id if len(users) > limit else None
+    return {"items": items, "next_after": next_after}
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+EXPORT_COLUMNS = ["id", "email", "full_name", "is_active"]
+
+
+def _ndjson_chunk(rows: List[Dict[str, Any]]) -> bytes:
+    return b"".join(orjson.dumps(row) + b"\n" for row in rows)
+
+
+def _csv_chunk(rows: List[Dict[str, Any]], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+async def _export_users(fmt: str) -> AsyncIterator[bytes]:
+    # own session: it has to outlive the endpoint and stay open while streaming
+    async with SessionLocal() as db:
+        if fmt == "csv":
+            yield _csv_chunk([], header=True)
+        async for rows in UserService.iter_user_rows(db, settings.USERS_EXPORT_CHUNK_SIZE):
+            yield _csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(rows)
+
+
+@router.get("/export", dependencies=[Depends(verify_access_token)])
+async def export_users(format: Literal["ndjson", "csv"] = "ndjson"):
+    # one chunk per cursor fetch, so memory stays flat whatever the table size
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_users(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
@@ -1,13 +1,29 @@
+from typing import Dict
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./test.db"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
 
     # App security
     SECRET_KEY: str = "changeme"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Password hashing pool (bcrypt)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    PASSWORD_HASH_MAX_WAIT_SECONDS: float = 3.0
+    PASSWORD_HASH_USE_PROCESSES: bool = True
+
+    # User listing (keyset pages) and export (rows fetched per cursor round trip)
+    USERS_PAGE_MAX_LIMIT: int = 500
+    USERS_EXPORT_CHUNK_SIZE: int = 1000
+
     # RAK Insurance
     RAK_USER_NAME: str
     RAK_PASSWORD: str
@@ -26,6 +42,79 @@ class Settings(BaseSettings):
     LIVA_PARTNERID: str
     LIVA_SUBSCRIPTIONKEY: str
 
+    # Insurer HTTP transport (pool is per insurer host)
+    INSURER_HTTP_MAX_CONNECTIONS: int = 100
+    INSURER_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    INSURER_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    INSURER_HTTP_CONNECT_TIMEOUT: float = 5.0
+    INSURER_HTTP_READ_TIMEOUT: float = 25.0
+    INSURER_HTTP_WRITE_TIMEOUT: float = 10.0
+    INSURER_HTTP_POOL_TIMEOUT: float = 5.0
+    INSURER_HTTP_TOTAL_TIMEOUT: float = 30.0
+
+    # Insurer tokens
+    INSURER_TOKEN_REFRESH_MARGIN_SECONDS: int = 300
+    # cross-worker refresh: how long a login lease lasts (SQLite) and how long
+    # other workers wait for the holder's token before logging in themselves
+    INSURER_TOKEN_LEASE_SECONDS: float = 60.0
+    INSURER_TOKEN_LEASE_WAIT_SECONDS: float = 10.0
+    INSURER_TOKEN_LEASE_POLL_SECONDS: float = 0.2
+    INSURER_TOKEN_RETRY_SECONDS: int = 30
+
+    # Quote cache (TTL overrides are keyed by insurer code, e.g. {"rak": 120})
+    QUOTE_CACHE_MAX_ENTRIES: int = 5000
+    QUOTE_CACHE_TTL_SECONDS: float = 300.0
+    QUOTE_CACHE_TTL_OVERRIDES: Dict[str, float] = {}
+
+    # Per-insurer quote deadline inside the /get-quotes fan-out
+    INSURER_QUOTE_DEADLINE_SECONDS: float = 12.0
+    INSURER_QUOTE_DEADLINE_OVERRIDES: Dict[str, float] = {}
+
+    # Insurer circuit breakers / adaptive timeouts
+    INSURER_CIRCUIT_WINDOW: int = 50
+    INSURER_CIRCUIT_MIN_CALLS: int = 10
+    INSURER_CIRCUIT_FAILURE_RATE: float = 0.5
+    INSURER_CIRCUIT_OPEN_SECONDS: float = 30.0
+    INSURER_CIRCUIT_HALF_OPEN_CALLS: int = 1
+    INSURER_TIMEOUT_P95_MULTIPLIER: float = 2.0
+    INSURER_TIMEOUT_MIN_SECONDS: float = 2.0
+    INSURER_HEDGE_ENABLED: bool = False
+
+    # Outbound scheduling: per-insurer token bucket + concurrency cap, shared by
+    # auth and rating calls. Overrides per insurer, e.g.
+    # {"rak": {"rate": 5, "burst": 10, "concurrency": 4}}. The rate is opt-in
+    # (0 = unlimited) until the insurers' real quotas are configured.
+    INSURER_RATE_PER_SECOND: float = 0.0
+    INSURER_RATE_BURST: int = 20
+    INSURER_MAX_CONCURRENCY: int = 16
+    INSURER_QUEUE_MAX_WAIT_SECONDS: float = 2.0
+    INSURER_LIMIT_OVERRIDES: Dict[str, Dict[str, float]] = {}
+
+    # Admission control for /travel/get-quotes: streams in flight, a short wait
+    # queue, and the share of both a single authenticated partner may hold
+    QUOTE_ADMISSION_MAX_IN_FLIGHT: int = 200
+    QUOTE_ADMISSION_MAX_QUEUE: int = 50
+    QUOTE_ADMISSION_MAX_WAIT_SECONDS: float = 0.5
+    QUOTE_ADMISSION_PARTNER_SHARE: float = 0.25
+    QUOTE_ADMISSION_RETRY_AFTER_SECONDS: int = 2
+
+    # Server-sent events
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    SSE_QUEUE_MAXSIZE: int = 32
+
+    # Batch quoting
+    QUOTE_BATCH_MAX_REQUESTS: int = 500
+    QUOTE_BATCH_CONCURRENCY_PER_INSURER: int = 8
+
+    # Quote store (write-behind persistence of streamed plan cards)
+    QUOTE_STORE_ENABLED: bool = True
+    QUOTE_STORE_BATCH_SIZE: int = 200
+    QUOTE_STORE_FLUSH_SECONDS: float = 0.5
+    QUOTE_STORE_MAX_PENDING: int = 10000
+
+    # Metrics: fraction of /get-quotes requests whose stages are profiled
+    METRICS_PROFILE_SAMPLE_RATE: float = 0.0
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,54 @@
+from pathlib import Path
+from typing import List
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import Table, text
+from sqlalchemy.engine import Connection
+
+from app.db.base import Base
+
+
+# ---------------------------------------------------------------------------
+# Schema ownership
+# ---------------------------------------------------------------------------
+#
+# users and third_party_auth predate migrations and are still created by
+# create_all at startup. Tables marked info={"migrations": True} belong to
+# Alembic only; startup runs `alembic upgrade head` for them on the same
+# connection, so booting the app and running alembic by hand never race to
+# create the same table.
+#
+# Every worker runs this at boot. On Postgres the whole step holds a
+# transaction-level advisory lock, so workers migrate one after another and
+# the later ones find nothing left to do.
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# arbitrary, but fixed: every worker must ask for the same lock
+SCHEMA_LOCK_ID = 7_240_301
+
+
+def startup_tables() -> List[Table]:
+    return [t for t in Base.metadata.sorted_tables if not t.info.get("migrations")]
+
+
+def alembic_config(connection: Connection | None = None) -> Config:
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    if connection is not None:
+        # picked up by migrations/env.py instead of opening its own engine
+        config.attributes["connection"] = connection
+    return config
+
+
+def run_migrations(connection: Connection) -> None:
+    command.upgrade(alembic_config(connection), "head")
+
+
+def create_schema(connection: Connection) -> None:
+    if connection.dialect.name == "postgresql":
+        # released when the caller's transaction commits
+        connection.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": SCHEMA_LOCK_ID})
+    Base.metadata.create_all(connection, tables=startup_tables())
+    run_migrations(connection)
@@ -0,0 +1,22 @@
+from sqlalchemy import JSON, Column, Numeric, String, TIMESTAMP
+from sqlalchemy.dialects.postgresql import JSONB
+from app.db.base import Base
+
+class TravelQuote(Base):
+    __tablename__ = "travel_quotes"
+    # created by Alembic (migrations/versions), not by create_all at startup
+    __table_args__ = {"info": {"migrations": True}}
+
+    # generated in-process so the SSE event can carry it before the row is written
+    id = Column(String(32), primary_key=True)
+    insurer = Column(String(20), nullable=False, index=True)
+    # the request body itself holds traveller PII and is not persisted
+    fingerprint = Column(String(64), nullable=False, index=True)
+    plan_name = Column(String(255), nullable=True)
+    premium_total = Column(Numeric(12, 2), nullable=True)
+    currency = Column(String(3), nullable=True)
+    plan = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<TravelQuote id={self.id}, insurer='{self.insurer}', plan='{self.plan_name}'>"
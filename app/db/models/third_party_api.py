@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP
+from sqlalchemy import JSON, Column, Integer, String, Text, TIMESTAMP
 from sqlalchemy.sql import func
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.dialects.postgresql import JSONB  
@@ -11,7 +11,8 @@ class ThirdPartyAuth(Base):
     name = Column(String(100), nullable=False)
     base_url = Column(Text, nullable=False)
     auth_url = Column(Text, nullable=False)
-    auth_config = Column(MutableDict.as_mutable(JSONB), nullable=True)
+    # JSONB on Postgres, plain JSON on the SQLite dev database
+    auth_config = Column(MutableDict.as_mutable(JSON().with_variant(JSONB(), "postgresql")), nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), onupdate=func.now())
 
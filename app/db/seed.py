@@ -1,6 +1,6 @@
-from app.api.v1.endpoints.third_party.travel.auth import authenticate_all_providers
 from app.db.models.third_party_api import ThirdPartyAuth
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 
 providers = [
@@ -64,15 +64,14 @@ providers = [
 
 
 
-def seed_third_party_providers(db: Session):
+async def seed_third_party_providers(db: AsyncSession):
     try:
         for provider in providers:
             # Check if provider already exists
-            existing = (
-                db.query(ThirdPartyAuth)
-                .filter(ThirdPartyAuth.name == provider.name)
-                .first()
+            result = await db.execute(
+                select(ThirdPartyAuth).where(ThirdPartyAuth.name == provider.name)
             )
+            existing = result.scalars().first()
 
             if existing:
                 print(f"[SEED] Provider already exists → {provider.name}")
@@ -80,15 +79,14 @@ def seed_third_party_providers(db: Session):
 
             # Add new provider
             db.add(provider)
-            db.flush()   # Get ID assigned
-            db.refresh(provider)
+            await db.flush()   # Get ID assigned
+            await db.refresh(provider)
 
             print(f"[SEED] Added provider → {provider.name}")
 
-        db.commit()
-        authenticate_all_providers(db)
+        await db.commit()
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print("[SEED] Error while seeding providers:", str(e))
         raise
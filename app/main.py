@@ -1,23 +1,45 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api.v1.router import api_router
+from app.api.v1.endpoints import health, metrics
+from app.api.v1.endpoints.third_party.travel.transport import close_clients
+from app.api.v1.endpoints.third_party.travel.token_manager import token_manager
 from app.core.config import settings
-from app.db.base import Base
+from app.db.migrate import create_schema
 from app.db.seed import seed_third_party_providers
 from app.db.session import SessionLocal, engine
-
-Base.metadata.create_all(bind=engine)
+from app.services.quote_store import quote_store
+from app.utils.metrics import cprofile_stage_hook, register_stage_hook
+from app.utils.password import password_pool
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    db = SessionLocal()
-    try:
-        seed_third_party_providers(db)
-    finally:
-        db.close()
+    password_pool.start()
+
+    if settings.METRICS_PROFILE_SAMPLE_RATE > 0:
+        register_stage_hook(cprofile_stage_hook)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(create_schema)
+
+    async with SessionLocal() as db:
+        await seed_third_party_providers(db)
+
+    quote_store.start()
+
+    # insurer logins must not hold up serving traffic; /health/ready reports them
+    token_manager.start_warm_up()
 
     yield
+
+    await token_manager.close()
+    await close_clients()
+    await quote_store.close()
+    await engine.dispose()
+    password_pool.shutdown()
     
 app = FastAPI(title="Protego App",lifespan=lifespan)
+app.include_router(health.router, prefix="/health", tags=["health"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 app.include_router(api_router, prefix="/api/v1")
 
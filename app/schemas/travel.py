@@ -1,6 +1,6 @@
 from typing import List, Optional
-from pydantic import BaseModel, EmailStr
-from datetime import date
+from pydantic import BaseModel, EmailStr, Field
+from datetime import date, datetime
 
 # Traveller model
 class Traveller(BaseModel):
@@ -37,3 +37,75 @@ class PersonalDetails(BaseModel):
 class TravelInsuranceRequest(BaseModel):
     travel_details: TravelDetails
     personal_details: PersonalDetails
+
+# Batch quoting (brokers / bulk comparisons)
+class TravelQuoteBatchRequest(BaseModel):
+    requests: List[TravelInsuranceRequest] = Field(..., min_length=1)
+
+
+# ---------------------------------------------------------------------------
+# RAK rating request body (gettravelrating); built by rak.build_rak_request
+# ---------------------------------------------------------------------------
+
+class RakTravellerInfo(BaseModel):
+    name: str
+    relation: Optional[str] = None
+    dob: date
+
+class RakRatingRequest(BaseModel):
+    tripStartDate: date
+    tripEndDate: date
+    tripDuration: int
+    travelType: str
+    destination: str
+    departure: str
+    tripType: str
+    traveller: str
+    noOfTravellers: str
+    travelling: str = "Yes"
+    coverage: str
+    incWorldwide: bool
+    travellerInfo: List[RakTravellerInfo]
+    email: str
+    contactNo: str
+
+
+# ---------------------------------------------------------------------------
+# Canonical plan card (what every adapter's map_plans produces)
+# ---------------------------------------------------------------------------
+
+class EmergencyCoverage(BaseModel):
+    emergency_medical_amount: Optional[str] = None
+    delayed_departure_amount: Optional[str] = None
+
+class AccidentCoverage(BaseModel):
+    personal_accident_amount: Optional[str] = None
+    repatriation_expenses_amount: Optional[str] = None
+
+class AdditionalCoverage(BaseModel):
+    personal_liability_amount: Optional[str] = None
+    delayed_baggage_amount: Optional[str] = None
+    loss_of_id_amount: Optional[str] = None
+
+class CoverageSummary(BaseModel):
+    emergency: EmergencyCoverage
+    accident: AccidentCoverage
+    additional: AdditionalCoverage
+
+class PlanCard(BaseModel):
+    insurer_code: str
+    insurer_name: str
+    plan_name: Optional[str] = None
+    currency: str
+    premium_total: Optional[float] = None
+    coverage_summary: CoverageSummary
+    # set once the quote store has recorded the plan
+    quote_id: Optional[str] = None
+
+# A plan as persisted by the quote store (GET /travel/quotes/{quote_id})
+class StoredQuote(BaseModel):
+    quote_id: str
+    insurer: str
+    fingerprint: str
+    plan: PlanCard
+    created_at: datetime
@@ -7,6 +7,11 @@ class UserRead(BaseModel):
     name: str | None = None
     is_active: bool
 
+class UserPage(BaseModel):
+    items: list[UserRead]
+    # pass back as ?after= for the next page; None on the last page
+    next_after: int | None = None
+
 class TokenUser(BaseModel):
     id: int
     email: str
@@ -19,4 +24,5 @@ class TokenResponse(BaseModel):
 
 class UserCreate(BaseModel):
     email: str
-    password: str
\ No newline at end of file
+    password: str
+    full_name: str | None = None
\ No newline at end of file
@@ -0,0 +1,117 @@
+# batch quoting: many TravelInsuranceRequests, one streamed NDJSON response
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import orjson
+
+from app.core.config import settings
+from app.schemas.travel import TravelInsuranceRequest
+from app.api.v1.endpoints.third_party.travel.base import InsurerAdapter
+from app.api.v1.endpoints.third_party.travel.quote_cache import request_fingerprint
+from app.api.v1.endpoints.third_party.travel.registry import get_adapters
+from app.api.v1.endpoints.third_party.travel.scheduler import BATCH, priority
+from app.utils.metrics import track_stream
+from app.utils.sse import result_status
+
+
+def _line(data: Dict[str, Any]) -> bytes:
+    return orjson.dumps(data, default=str) + b"\n"
+
+
+class QuoteBatchService:
+
+    @staticmethod
+    def plan_jobs(
+        requests: List[TravelInsuranceRequest],
+        adapters: List[InsurerAdapter],
+    ) -> Tuple[List[Tuple[InsurerAdapter, Dict[str, Any], List[int]]], List[Dict[str, Any]]]:
+        # One job per distinct insurer request body; the input indices that
+        # normalise to the same body share its result.
+        jobs = []
+        failures = []
+
+        for adapter in adapters:
+            groups: Dict[str, Tuple[Dict[str, Any], List[int]]] = {}
+            for index, payload in enumerate(requests):
+                try:
+                    body = adapter.build_request(payload)
+                except Exception as exc:
+                    failures.append({
+                        "index": index,
+                        "api": adapter.code,
+                        "status": "error",
+                        "error": f"Could not build {adapter.insurer} request: {exc}",
+                    })
+                    continue
+                key = request_fingerprint(adapter.code, body)
+                groups.setdefault(key, (body, []))[1].append(index)
+
+            jobs.extend((adapter, body, indices) for body, indices in groups.values())
+
+        return jobs, failures
+
+    @staticmethod
+    async def stream(requests: List[TravelInsuranceRequest]) -> AsyncIterator[bytes]:
+        started = time.perf_counter()
+        adapters = get_adapters()
+        jobs, failures = QuoteBatchService.plan_jobs(requests, adapters)
+
+        for failure in failures:
+            yield _line(failure)
+
+        semaphores = {
+            adapter.code: asyncio.Semaphore(settings.QUOTE_BATCH_CONCURRENCY_PER_INSURER)
+            for adapter in adapters
+        }
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.SSE_QUEUE_MAXSIZE)
+        statuses: Dict[str, int] = {}
+        upstream_calls = 0
+
+        def count_upstream() -> None:
+            nonlocal upstream_calls
+            upstream_calls += 1
+
+        async def run(adapter: InsurerAdapter, body: Dict[str, Any], indices: List[int]):
+            async with semaphores[adapter.code]:
+                try:
+                    async with asyncio.timeout(adapter.deadline):
+                        response = await adapter.quote(body, count_upstream)
+                    result = {"status": result_status(response), "response": response}
+                except TimeoutError:
+                    result = {
+                        "status": "timeout",
+                        "error": f"{adapter.code} did not respond within {adapter.deadline}s",
+                    }
+                except Exception as exc:
+                    result = {"status": getattr(exc, "event_status", "error"), "error": str(exc)}
+            await queue.put((adapter.code, indices, result))
+
+        # bulk quoting yields outbound slots to interactive /get-quotes traffic
+        with priority(BATCH):
+            tasks = [asyncio.create_task(run(*job)) for job in jobs]
+
+        with track_stream("batch"):
+            try:
+                for _ in range(len(tasks)):
+                    code, indices, result = await queue.get()
+                    statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+                    for index in indices:
+                        yield _line({"index": index, "api": code, **result})
+
+                yield _line({
+                    "summary": {
+                        "requests": len(requests),
+                        # distinct insurer request bodies after deduplication
+                        "distinct_requests": len(jobs),
+                        # of those, the ones not served by the quote cache
+                        "upstream_calls": upstream_calls,
+                        "deduplicated": len(requests) * len(adapters) - len(failures) - len(jobs),
+                        "statuses": statuses,
+                        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                    }
+                })
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
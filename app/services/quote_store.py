@@ -0,0 +1,262 @@
+# write-behind persistence of mapped plan cards, retrievable by quote ID
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.quote import TravelQuote
+from app.db.session import SessionLocal
+from app.api.v1.endpoints.third_party.travel.quote_cache import request_fingerprint
+from app.utils.metrics import QUOTE_STORE_DROPPED_TOTAL
+
+
+# ---------------------------------------------------------------------------
+# Quote store
+# ---------------------------------------------------------------------------
+#
+# record() queues one row per plan card and stamps the card with its quote_id;
+# it never awaits, so the quote stream is not slowed down by the database. A
+# background task drains the queue and writes up to batch_size rows per
+# executemany INSERT, at least every flush_seconds. Rows not yet written are
+# served from memory, so a quote is retrievable as soon as it was streamed.
+#
+# A quote_id is only handed out for a row the store accepted: when
+# max_pending rows are already waiting, the plans are streamed without one
+# (and counted as dropped) rather than blocking. A failed INSERT keeps its
+# rows queued and retrievable, and is retried with exponential backoff.
+#
+# A batch that keeps failing while the database is reachable (a row that
+# overflows a column, a constraint violation) would otherwise sit at the head
+# of the queue for good. After BATCH_ATTEMPTS failures the batch is written
+# row by row, and rows that still fail are dropped and counted.
+
+MAX_RETRY_SECONDS = 30.0
+CLOSE_ATTEMPTS = 3
+BATCH_ATTEMPTS = 3
+
+
+def _database_down(exc: Exception) -> bool:
+    # connection trouble says nothing about the rows; keep them and back off
+    return isinstance(exc, (OperationalError, InterfaceError, OSError)) or getattr(
+        exc, "connection_invalidated", False
+    )
+
+def _decimal(value: Any) -> Optional[Decimal]:
+    try:
+        return Decimal(str(value)) if value is not None else None
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _to_dict(quote: TravelQuote) -> Dict[str, Any]:
+    return {
+        "quote_id": quote.id,
+        "insurer": quote.insurer,
+        "fingerprint": quote.fingerprint,
+        "plan": quote.plan,
+        "created_at": quote.created_at,
+    }
+
+
+class QuoteStore:
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = SessionLocal,
+        batch_size: int = 200,
+        flush_seconds: float = 0.5,
+        max_pending: int = 10_000,
+    ):
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+
+        self._queue: List[Dict[str, Any]] = []
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._retry_delay: Optional[float] = None
+        self._batch_failures = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        # let the writer drain the queue instead of cancelling it mid-insert
+        task, self._task = self._task, None
+        if task is not None:
+            self._closing = True
+            self._wakeup.set()
+            await task
+        for _ in range(CLOSE_ATTEMPTS):
+            if await self._flush_all():
+                break
+        if self._queue:
+            print(f"[QUOTES] Shutting down with {len(self._queue)} quotes not persisted")
+
+    # -- write path ---------------------------------------------------------
+
+    def record(
+        self,
+        insurer: str,
+        request_body: Dict[str, Any],
+        plans: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        if not plans:
+            return plans
+
+        # _pending holds every row not yet written, queued or being retried
+        if len(self._pending) + len(plans) > self.max_pending:
+            self.dropped += len(plans)
+            QUOTE_STORE_DROPPED_TOTAL.inc(len(plans), insurer=insurer, reason="queue_full")
+            print(f"[QUOTES] Store queue full, dropped {len(plans)} {insurer} quotes")
+            return plans
+
+        fingerprint = request_fingerprint(insurer, request_body)
+        created_at = datetime.now(timezone.utc)
+        rows = []
+        for plan in plans:
+            quote_id = uuid.uuid4().hex
+            rows.append({
+                "id": quote_id,
+                "insurer": insurer,
+                "fingerprint": fingerprint,
+                "plan_name": plan.get("plan_name"),
+                "premium_total": _decimal(plan.get("premium_total")),
+                "currency": plan.get("currency"),
+                "plan": plan,
+                "created_at": created_at,
+            })
+            plan["quote_id"] = quote_id
+
+        self._queue.extend(rows)
+        self._pending.update((row["id"], row) for row in rows)
+        if (
+            self._wakeup is not None
+            and self._retry_delay is None
+            and len(self._queue) >= self.batch_size
+        ):
+            self._wakeup.set()
+        return plans
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._retry_delay or self.flush_seconds)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            if await self._flush_all():
+                self._retry_delay = None
+            else:
+                # database trouble: back off; full batches don't wake us meanwhile
+                delay = (self._retry_delay or self.flush_seconds) * 2
+                self._retry_delay = min(delay, MAX_RETRY_SECONDS)
+
+    async def _flush_all(self) -> bool:
+        while self._queue:
+            if not await self._flush():
+                return False
+        return True
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        async with self._session_factory() as db:
+            await db.execute(insert(TravelQuote), rows)
+            await db.commit()
+
+    def _done(self, rows: List[Dict[str, Any]]) -> None:
+        # record() only appends, so the head of the queue is still these rows
+        del self._queue[:len(rows)]
+        for row in rows:
+            self._pending.pop(row["id"], None)
+
+    async def _flush(self) -> bool:
+        # rows leave the queue (and _pending) only once they are committed
+        # or given up on
+        batch = self._queue[:self.batch_size]
+        if self._batch_failures >= BATCH_ATTEMPTS:
+            return await self._flush_rows(batch)
+
+        started = time.perf_counter()
+        try:
+            await self._insert(batch)
+        except Exception as exc:
+            self.failed += len(batch)
+            if not _database_down(exc):
+                self._batch_failures += 1
+            print(f"[QUOTES] Bulk insert of {len(batch)} quotes failed, will retry: {exc}")
+            return False
+
+        self._batch_failures = 0
+        self._done(batch)
+        self.written += len(batch)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms > 1000:
+            print(f"[QUOTES] Slow bulk insert: {len(batch)} rows in {elapsed_ms:.0f}ms")
+        return True
+
+    async def _flush_rows(self, batch: List[Dict[str, Any]]) -> bool:
+        # isolate the rows that keep the batch from being written
+        for row in batch:
+            try:
+                await self._insert([row])
+            except Exception as exc:
+                if _database_down(exc):
+                    print(f"[QUOTES] Database unavailable, will retry: {exc}")
+                    return False
+                self.dropped += 1
+                QUOTE_STORE_DROPPED_TOTAL.inc(insurer=row["insurer"], reason="insert_failed")
+                print(f"[QUOTES] Dropped quote {row['id']} that cannot be written: {exc}")
+            else:
+                self.written += 1
+            self._done([row])
+
+        self._batch_failures = 0
+        return True
+
+    # -- read path ----------------------------------------------------------
+
+    async def get(self, quote_id: str) -> Optional[Dict[str, Any]]:
+        row = self._pending.get(quote_id)
+        if row is not None:
+            return {
+                "quote_id": row["id"],
+                "insurer": row["insurer"],
+                "fingerprint": row["fingerprint"],
+                "plan": row["plan"],
+                "created_at": row["created_at"],
+            }
+
+        async with self._session_factory() as db:
+            quote = await db.get(TravelQuote, quote_id)
+        return _to_dict(quote) if quote is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": len(self._queue),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+quote_store = QuoteStore(
+    batch_size=settings.QUOTE_STORE_BATCH_SIZE,
+    flush_seconds=settings.QUOTE_STORE_FLUSH_SECONDS,
+    max_pending=settings.QUOTE_STORE_MAX_PENDING,
+)
@@ -1,5 +1,6 @@
 # place for business logic / user-related operations
-from sqlalchemy.orm import Session
+from typing import Any, AsyncIterator, Dict, List
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.db.models.user import User
 from app.schemas.user import UserCreate
@@ -9,34 +10,54 @@ from app.utils.password import get_password_hash
 class UserService:
 
     @staticmethod
-    def get_user_by_email(db: Session, email: str) -> User | None:
-        return db.query(User).filter(User.email == email).first()
+    async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
 
     @staticmethod
-    def get_user_by_id(db: Session, user_id: int) -> User | None:
-        return db.query(User).filter(User.id == user_id).first()
+    async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
+        return await db.get(User, user_id)
 
     @staticmethod
-    def create_user(db: Session, payload: UserCreate) -> User:
+    async def create_user(db: AsyncSession, payload: UserCreate, hashed_password: str | None = None) -> User:
         user = User(
             email=payload.email,
             full_name=payload.full_name,
-            hashed_password=get_password_hash(payload.password)
+            hashed_password=hashed_password or get_password_hash(payload.password)
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
 
     @staticmethod
-    def get_all_users(db: Session, skip: int = 0, limit: int = 100):
-        return db.query(User).offset(skip).limit(limit).all()
+    async def get_all_users(db: AsyncSession, after_id: int | None = None, limit: int = 100) -> List[User]:
+        # keyset pagination: seek past the last id seen (index range scan)
+        # instead of OFFSET, which reads and discards every skipped row
+        query = select(User).order_by(User.id).limit(limit)
+        if after_id is not None:
+            query = query.where(User.id > after_id)
+        result = await db.execute(query)
+        return list(result.scalars().all())
 
     @staticmethod
-    def delete_user(db: Session, user_id: int) -> bool:
-        user = db.query(User).filter(User.id == user_id).first()
+    async def iter_user_rows(db: AsyncSession, chunk_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        # server-side cursor, chunk_size rows per fetch; plain rows rather than
+        # ORM objects so nothing accumulates in the session
+        query = (
+            select(User.id, User.email, User.full_name, User.is_active)
+            .order_by(User.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await db.stream(query)
+        async for rows in result.mappings().partitions(chunk_size):
+            yield [dict(row) for row in rows]
+
+    @staticmethod
+    async def delete_user(db: AsyncSession, user_id: int) -> bool:
+        user = await db.get(User, user_id)
         if not user:
             return False
-        db.delete(user)
-        db.commit()
+        await db.delete(user)
+        await db.commit()
         return True
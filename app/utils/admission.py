@@ -0,0 +1,143 @@
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app.core.config import settings
+from app.utils.metrics import ADMISSION_REQUESTS_TOTAL, ADMISSION_WAIT_SECONDS
+from app.utils.waiters import WaitQueue
+
+
+# ---------------------------------------------------------------------------
+# Inbound admission control
+# ---------------------------------------------------------------------------
+#
+# A quote stream holds a connection, upstream sockets and memory for its whole
+# lifetime, so a burst of them can take the process down together with the
+# login and user endpoints. At most max_in_flight streams run at once; up to
+# max_queue more may wait, none longer than max_wait, and everything beyond
+# that is turned away straight away (503 + Retry-After) instead of piling up.
+#
+# Fair share: requests from an authenticated partner (a broker's access
+# token, see lob_endpoints/travel.py) may hold at most partner_share of the
+# in-flight slots and of the queue each, so one broker's burst queues behind
+# its own cap rather than starving everyone else. Waiters blocked only by
+# their partner cap are skipped, not head-of-line blocking. Anonymous
+# requests have no partner and are bounded by the global caps alone; the
+# client-supplied partner_code is not trusted for this, since varying or
+# omitting it would escape the cap.
+
+class AdmissionRejected(Exception):
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Admission rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        max_queue: int,
+        max_wait: float,
+        partner_share: float = 1.0,
+        retry_after: int = 1,
+    ):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self.partner_in_flight = max(1, math.ceil(max_in_flight * partner_share))
+        self.partner_queue = max(1, math.ceil(max_queue * partner_share)) if max_queue else 0
+
+        self.in_flight = 0
+        self._partners: Dict[str, int] = {}
+        self._queue = WaitQueue()
+        self.rejected: Dict[str, int] = {}
+
+    # -- slots --------------------------------------------------------------
+
+    def _full(self) -> bool:
+        return self.in_flight >= self.max_in_flight
+
+    def _can_start(self, partner: Optional[str]) -> bool:
+        if self._full():
+            return False
+        return partner is None or self._partners.get(partner, 0) < self.partner_in_flight
+
+    def _try_start(self, partner: Optional[str]) -> bool:
+        if not self._can_start(partner):
+            return False
+        self.in_flight += 1
+        if partner is not None:
+            self._partners[partner] = self._partners.get(partner, 0) + 1
+        return True
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        ADMISSION_REQUESTS_TOTAL.inc(route=self.name, result=reason)
+        return AdmissionRejected(reason, self.retry_after)
+
+    async def acquire(self, partner: Optional[str] = None) -> float:
+        # anyone still queued is blocked on a cap this caller would hit too,
+        # or on another partner's share, so starting right away stays fair
+        if self._try_start(partner):
+            ADMISSION_REQUESTS_TOTAL.inc(route=self.name, result="admitted")
+            return 0.0
+
+        if len(self._queue) >= self.max_queue:
+            raise self._reject("queue_full")
+        if partner is not None and self._queue.count(partner) >= self.partner_queue:
+            raise self._reject("partner_limit")
+
+        waiter = self._queue.push(partner)
+        started = time.monotonic()
+        try:
+            await self._queue.wait(waiter, self.max_wait, lambda: self.release(partner))
+        except TimeoutError:
+            raise self._reject("timeout") from None
+
+        waited = time.monotonic() - started
+        ADMISSION_REQUESTS_TOTAL.inc(route=self.name, result="admitted")
+        ADMISSION_WAIT_SECONDS.observe(waited, route=self.name)
+        return waited
+
+    def release(self, partner: Optional[str] = None) -> None:
+        self.in_flight -= 1
+        if partner is not None:
+            self._partners[partner] -= 1
+            if not self._partners[partner]:
+                del self._partners[partner]
+        # waiters blocked only by their own partner's share are skipped
+        self._queue.dispatch(self._try_start, self._full)
+
+    @asynccontextmanager
+    async def admit(self, partner: Optional[str] = None) -> AsyncIterator[None]:
+        await self.acquire(partner)
+        try:
+            yield
+        finally:
+            self.release(partner)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": len(self._queue),
+            "partners": dict(self._partners),
+            "rejected": dict(self.rejected),
+        }
+
+
+quote_admission = AdmissionController(
+    "get_quotes",
+    max_in_flight=settings.QUOTE_ADMISSION_MAX_IN_FLIGHT,
+    max_queue=settings.QUOTE_ADMISSION_MAX_QUEUE,
+    max_wait=settings.QUOTE_ADMISSION_MAX_WAIT_SECONDS,
+    partner_share=settings.QUOTE_ADMISSION_PARTNER_SHARE,
+    retry_after=settings.QUOTE_ADMISSION_RETRY_AFTER_SECONDS,
+)
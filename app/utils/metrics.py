@@ -0,0 +1,311 @@
+import cProfile
+import contextvars
+import io
+import pstats
+import random
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+
+# ---------------------------------------------------------------------------
+# Minimal Prometheus-style metrics
+# ---------------------------------------------------------------------------
+#
+# Counters, gauges and histograms with labels, rendered in the Prometheus text
+# exposition format by render() (served at /metrics). Quote pipeline stages
+# are timed with `with stage("map", insurer="rak"):`; for a sampled fraction
+# of requests the registered stage hooks (e.g. cprofile_stage_hook) also wrap
+# each stage.
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = ([0] * (len(self.buckets) + 1), [0.0])
+            self._values[key] = entry
+        counts, total = entry
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += counts[-1]
+            le = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total[0]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+_metrics: List[_Metric] = []
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def _register(metric):
+    _metrics.append(metric)
+    return metric
+
+
+def register_collector(collector: Callable[[], List[str]]) -> None:
+    # for values that live elsewhere (quote cache, circuits); returns text lines
+    _collectors.append(collector)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Quote pipeline metrics
+# ---------------------------------------------------------------------------
+
+QUOTE_STAGE_SECONDS = _register(Histogram(
+    "quote_stage_seconds",
+    "Time spent per quote pipeline stage",
+    ("insurer", "stage"),
+))
+INSURER_REQUEST_SECONDS = _register(Histogram(
+    "insurer_request_seconds",
+    "Upstream insurer HTTP latency",
+    ("insurer", "operation"),
+))
+INSURER_REQUESTS_TOTAL = _register(Counter(
+    "insurer_requests_total",
+    "Upstream insurer HTTP requests by status code (or error class)",
+    ("insurer", "operation", "status"),
+))
+INSURER_QUEUE_WAIT_SECONDS = _register(Histogram(
+    "insurer_queue_wait_seconds",
+    "Time outbound insurer calls waited for a rate-limit / concurrency slot",
+    ("insurer", "priority"),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+))
+INSURER_QUEUE_TIMEOUTS_TOTAL = _register(Counter(
+    "insurer_queue_timeouts_total",
+    "Outbound insurer calls that gave up waiting for a slot",
+    ("insurer", "priority"),
+))
+TOKEN_REFRESH_TOTAL = _register(Counter(
+    "insurer_token_refresh_total",
+    "Insurer token refresh attempts",
+    ("insurer", "result"),
+))
+ADMISSION_REQUESTS_TOTAL = _register(Counter(
+    "admission_requests_total",
+    "Inbound requests admitted or shed by admission control",
+    ("route", "result"),
+))
+ADMISSION_WAIT_SECONDS = _register(Histogram(
+    "admission_wait_seconds",
+    "Time admitted requests spent in the admission queue",
+    ("route",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+))
+QUOTE_STORE_DROPPED_TOTAL = _register(Counter(
+    "quote_store_dropped_total",
+    "Plan cards the quote store gave up on, by reason",
+    ("insurer", "reason"),
+))
+STREAM_SECONDS = _register(Histogram(
+    "quote_stream_seconds",
+    "Duration of quote streams (SSE / NDJSON)",
+    ("stream", "status"),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0, 60.0, 120.0),
+))
+STREAMS_ACTIVE = _register(Gauge(
+    "quote_streams_active",
+    "Quote streams currently open",
+    ("stream",),
+))
+
+
+# ---------------------------------------------------------------------------
+# Stage timing and sampled profiling hooks
+# ---------------------------------------------------------------------------
+
+StageHook = Callable[[str, Dict[str, str]], ContextManager]
+
+_stage_hooks: List[StageHook] = []
+_profile_sample_rate = settings.METRICS_PROFILE_SAMPLE_RATE
+_profiled: contextvars.ContextVar[bool] = contextvars.ContextVar("profiled", default=False)
+
+
+def register_stage_hook(hook: StageHook) -> None:
+    if hook not in _stage_hooks:
+        _stage_hooks.append(hook)
+
+
+def unregister_stage_hook(hook: StageHook) -> None:
+    if hook in _stage_hooks:
+        _stage_hooks.remove(hook)
+
+
+def set_profile_sample_rate(rate: float) -> None:
+    global _profile_sample_rate
+    _profile_sample_rate = max(0.0, min(1.0, rate))
+
+
+def sample_request(force: bool = False) -> bool:
+    # call once at the start of a request; stages below it inherit the decision
+    profiled = bool(_stage_hooks) and (
+        force or (_profile_sample_rate > 0 and random.random() < _profile_sample_rate)
+    )
+    _profiled.set(profiled)
+    return profiled
+
+
+@contextmanager
+def stage(name: str, insurer: str = "") -> Iterator[None]:
+    labels = {"insurer": insurer, "stage": name}
+    with ExitStack() as hooks:
+        if _profiled.get():
+            for hook in _stage_hooks:
+                hooks.enter_context(hook(name, labels))
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            QUOTE_STAGE_SECONDS.observe(time.perf_counter() - started, **labels)
+
+
+# cProfile can only be active once per thread, and an await inside the stage
+# would let another sampled request enable a second profiler and corrupt both;
+# so only the synchronous stages are profiled, one at a time
+PROFILED_STAGES = frozenset({"build_request", "decode", "map"})
+_profiling = False
+
+
+@contextmanager
+def cprofile_stage_hook(name: str, labels: Dict[str, str], top: int = 15) -> Iterator[None]:
+    global _profiling
+    if name not in PROFILED_STAGES or _profiling:
+        yield
+        return
+
+    _profiling = True
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _profiling = False
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        print(f"[PROFILE] stage={name} insurer={labels.get('insurer')}\n{out.getvalue()}")
+
+
+@contextmanager
+def track_stream(stream: str) -> Iterator[Dict[str, str]]:
+    # the caller may set outcome["status"] before the block exits
+    outcome = {"status": "complete"}
+    STREAMS_ACTIVE.inc(stream=stream)
+    started = time.perf_counter()
+    try:
+        yield outcome
+    except BaseException:
+        if outcome["status"] == "complete":
+            outcome["status"] = "aborted"
+        raise
+    finally:
+        STREAMS_ACTIVE.dec(stream=stream)
+        STREAM_SECONDS.observe(time.perf_counter() - started, stream=stream, status=outcome["status"])
+
+
+def observe_upstream(insurer: Optional[str], operation: str, status: str, seconds: float) -> None:
+    insurer = insurer or "unknown"
+    INSURER_REQUESTS_TOTAL.inc(insurer=insurer, operation=operation, status=status)
+    INSURER_REQUEST_SECONDS.observe(seconds, insurer=insurer, operation=operation)
@@ -1,5 +1,12 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
 from passlib.context import CryptContext
 
+from app.core.config import settings
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def _truncate(password: str) -> str:
@@ -10,3 +17,94 @@ def get_password_hash(password: str):
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(_truncate(plain_password), hashed_password)
+
+
+# ---------------------------------------------------------------------------
+# Dedicated bcrypt pool for request handlers
+# ---------------------------------------------------------------------------
+#
+# bcrypt is deliberately slow and CPU-bound. Running it in the default
+# threadpool lets a login burst occupy every worker thread (and the GIL), so
+# async handlers hand it to a separate, bounded process pool instead. At most
+# PASSWORD_HASH_WORKERS hashes run at once, up to PASSWORD_HASH_MAX_QUEUE more
+# may wait, and none waits longer than PASSWORD_HASH_MAX_WAIT_SECONDS.
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+class PasswordHashPool:
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int,
+        max_wait: float,
+        use_processes: bool = True,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.use_processes = use_processes
+
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        if self.use_processes:
+            # spawn: children import only this module, not the running app
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="bcrypt"
+            )
+        self._slots = asyncio.Semaphore(self.workers)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._slots = None
+        self._waiting = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        self.start()
+
+        if self._waiting >= self.max_queue:
+            raise PasswordHasherBusy("Password hashing queue is full")
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.max_wait)
+        except TimeoutError:
+            raise PasswordHasherBusy("Timed out waiting for a password hashing worker")
+        finally:
+            self._waiting -= 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._slots.release()
+
+
+password_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    max_wait=settings.PASSWORD_HASH_MAX_WAIT_SECONDS,
+    use_processes=settings.PASSWORD_HASH_USE_PROCESSES,
+)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_pool.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, plain_password, hashed_password)
@@ -1,6 +1,10 @@
 # app/core/security.py
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from http.client import HTTPException
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException,status
 from fastapi.security import OAuth2PasswordBearer
@@ -13,6 +17,14 @@ algorithm = "HS256"
 access_token_expire_minutes = 30
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/users")
 
+# verified claims are reused for a short while instead of re-checking the
+# signature on every request; entries never outlive the token's own exp
+verified_token_cache_size = 10_000
+verified_token_cache_ttl = 60
+
+_verified_tokens: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+_verified_tokens_lock = threading.Lock()
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=access_token_expire_minutes)
@@ -20,9 +32,40 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, secret_key, algorithm=algorithm)
     return encoded_jwt
 
+def _cached_claims(token: str) -> Optional[dict]:
+    with _verified_tokens_lock:
+        entry = _verified_tokens.get(token)
+        if entry is None:
+            return None
+        valid_until, claims = entry
+        if valid_until <= time.time():
+            del _verified_tokens[token]
+            return None
+        _verified_tokens.move_to_end(token)
+        return dict(claims)
+
+
+def _cache_claims(token: str, claims: dict) -> None:
+    valid_until = time.time() + verified_token_cache_ttl
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)):
+        valid_until = min(valid_until, exp)
+
+    with _verified_tokens_lock:
+        _verified_tokens[token] = (valid_until, dict(claims))
+        _verified_tokens.move_to_end(token)
+        while len(_verified_tokens) > verified_token_cache_size:
+            _verified_tokens.popitem(last=False)
+
+
 def verify_access_token(token: str = Depends(oauth2_scheme)):
+    cached = _cached_claims(token)
+    if cached is not None:
+        return cached
+
     try:
         payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+        _cache_claims(token, payload)
         return payload
     except JWTError:
         raise HTTPException(
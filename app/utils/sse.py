@@ -1,37 +1,118 @@
 import asyncio
-import json
+import time
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import Request
 from fastapi.responses import StreamingResponse
 
+from app.core.config import settings
+from app.utils.metrics import track_stream
+
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    # stop nginx-style proxies from buffering the stream
+    "X-Accel-Buffering": "no",
+}
+
+HEARTBEAT = b": keep-alive\n\n"
+
+
+def encode_event(data: Any, event: Optional[str] = None) -> bytes:
+    payload = b"data: " + orjson.dumps(data, default=str) + b"\n\n"
+    if event:
+        return f"event: {event}\n".encode() + payload
+    return payload
 
-async def sse_parallel(functions: list):
+
+def result_status(response: Any) -> str:
+    # an error card (insurer failed, circuit open, ...) comes back as a normal
+    # return value, but it is not a success
+    if isinstance(response, dict) and response.get("error"):
+        return "error"
+    return "ok"
+
+
+async def sse_parallel(
+    functions: list,
+    request: Optional[Request] = None,
+    heartbeat_interval: Optional[float] = None,
+    queue_size: Optional[int] = None,
+):
+    heartbeat_interval = heartbeat_interval or settings.SSE_HEARTBEAT_SECONDS
+    queue_size = queue_size or settings.SSE_QUEUE_MAXSIZE
 
     async def event_stream():
-        queue = asyncio.Queue()
+        # bounded: workers wait here instead of piling results up in memory
+        queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        started = time.perf_counter()
+        sources: Dict[str, Dict[str, Any]] = {}
 
         # worker that calls each function
         async def worker(item):
             name = item["name"]
             func = item["func"]
+            timeout = item.get("timeout")
+            t0 = time.perf_counter()
 
             try:
-                response = await func()
-                await queue.put({"api": name, "response": response})
+                async with asyncio.timeout(timeout):
+                    response = await func()
+                event = {"api": name, "status": result_status(response), "response": response}
+            except TimeoutError:
+                event = {
+                    "api": name,
+                    "status": "timeout",
+                    "error": f"{name} did not respond within {timeout}s",
+                }
             except Exception as e:
-                await queue.put({"api": name, "error": str(e)})
+                # exceptions may name their own status (e.g. "queue_timeout")
+                status = getattr(e, "event_status", "error")
+                event = {"api": name, "status": status, "error": str(e)}
 
-        # producer: runs all workers in parallel
-        async def producer():
-            tasks = [asyncio.create_task(worker(fn)) for fn in functions]
-            await asyncio.gather(*tasks)
-            await queue.put(None)  # signal completion
+            sources[name] = {
+                "status": event["status"],
+                "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+            }
+            await queue.put(event)
+
+        tasks = [asyncio.create_task(worker(fn)) for fn in functions]
+        pending = len(tasks)
+        status = "complete"
+
+        with track_stream("sse") as outcome:
+            try:
+                while pending:
+                    try:
+                        item = await asyncio.wait_for(queue.get(), heartbeat_interval)
+                    except TimeoutError:
+                        if request is not None and await request.is_disconnected():
+                            status = "disconnected"
+                            break
+                        yield HEARTBEAT
+                        continue
 
-        asyncio.create_task(producer())
+                    pending -= 1
+                    yield encode_event(item)
 
-        # yield queue results as SSE messages
-        while True:
-            item = await queue.get()
-            if item is None:
-                break
-            yield f"data: {json.dumps(item)}\n\n"
+                if status == "complete":
+                    yield encode_event(
+                        {
+                            "status": status,
+                            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                            "sources": sources,
+                        },
+                        event="summary",
+                    )
+                outcome["status"] = status
+            finally:
+                # client went away (or the stream was torn down): stop upstream work
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
 
-    return StreamingResponse(event_stream(), media_type="text/event-stream")
+    return StreamingResponse(
+        event_stream(), media_type="text/event-stream", headers=SSE_HEADERS
+    )
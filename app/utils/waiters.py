@@ -0,0 +1,102 @@
+import asyncio
+import bisect
+import itertools
+from typing import Callable, Dict, Hashable, List, Optional
+
+
+# ---------------------------------------------------------------------------
+# Wait queue shared by outbound scheduling and inbound admission control
+# ---------------------------------------------------------------------------
+#
+# Callers that cannot take a slot straight away park a future here, ordered
+# by priority (lower first), then arrival. Whoever frees a slot calls
+# dispatch(), which hands slots out in that order: it stops once nothing more
+# can start at all, and skips a waiter only held back by its own key (e.g. a
+# partner at its share). A waiter that gives up (timeout, cancellation)
+# leaves the queue; one granted at the very moment it gave up hands the slot
+# straight back, so slots never leak.
+
+class Waiter:
+    __slots__ = ("priority", "seq", "key", "future", "owner")
+
+    def __init__(self, priority: int, seq: int, key: Hashable, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.key = key
+        self.future = future
+        # the task that queued, so its calls can be promoted later
+        self.owner: Optional[asyncio.Task] = asyncio.current_task()
+
+    def order(self):
+        return self.priority, self.seq
+
+
+class WaitQueue:
+
+    def __init__(self):
+        self._waiters: List[Waiter] = []
+        self._seq = itertools.count()
+        self._counts: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._waiters)
+
+    def count(self, key: Hashable) -> int:
+        return self._counts.get(key, 0)
+
+    def waiting(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.future.done())
+
+    def priorities(self) -> List[int]:
+        return [waiter.priority for waiter in self._waiters]
+
+    def push(self, key: Hashable = None, priority: int = 0) -> Waiter:
+        future = asyncio.get_running_loop().create_future()
+        waiter = Waiter(priority, next(self._seq), key, future)
+        bisect.insort(self._waiters, waiter, key=Waiter.order)
+        self._counts[key] = self._counts.get(key, 0) + 1
+        return waiter
+
+    def _remove(self, waiter: Waiter) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            return
+        self._counts[waiter.key] -= 1
+        if not self._counts[waiter.key]:
+            del self._counts[waiter.key]
+
+    async def wait(self, waiter: Waiter, timeout: float, release: Callable[[], None]) -> None:
+        # raises TimeoutError after timeout; callers turn it into their own error
+        try:
+            async with asyncio.timeout(timeout):
+                await waiter.future
+        except BaseException:
+            self._remove(waiter)
+            if waiter.future.done() and not waiter.future.cancelled():
+                release()
+            raise
+
+    def dispatch(self, try_start: Callable[[Hashable], bool], blocked: Callable[[], bool]) -> None:
+        loop = asyncio.get_running_loop()
+        for waiter in list(self._waiters):
+            if waiter.future.done() or waiter.future.get_loop() is not loop:
+                # gave up while queued, or left over from a loop that is gone
+                self._remove(waiter)
+                continue
+            if blocked():
+                break
+            if try_start(waiter.key):
+                self._remove(waiter)
+                waiter.future.set_result(None)
+
+    def promote(self, owner: asyncio.Task, priority: int) -> bool:
+        # requeue owner's waiters at priority, keeping their arrival order
+        moved = False
+        for waiter in self._waiters:
+            if waiter.owner is owner and priority < waiter.priority:
+                waiter.priority = priority
+                moved = True
+        if moved:
+            self._waiters.sort(key=Waiter.order)
+        return moved
@@ -0,0 +1,111 @@
+"""Login throughput with the dedicated bcrypt pool.
+
+Drives POST /users/login in-process at a target concurrency and, in parallel,
+probes GET /users/user/{id} to show how much the burst delays unrelated
+requests. Compare executors with:
+
+    python -m benchmarks.bench_login --executor process
+    python -m benchmarks.bench_login --executor thread
+    python -m benchmarks.bench_login --executor threadpool   # previous behaviour
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import List
+
+# an isolated SQLite file so the benchmark never touches the dev database
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench_login.db"
+)
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from starlette.concurrency import run_in_threadpool  # noqa: E402
+
+from app.api.v1.endpoints import users  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.utils import password  # noqa: E402
+from benchmarks.harness import report  # noqa: E402
+
+
+async def run(executor: str, requests: int, concurrency: int) -> None:
+    if executor == "threadpool":
+        async def verify(plain, hashed):
+            return await run_in_threadpool(password.verify_password, plain, hashed)
+
+        users.verify_password_async = verify
+    else:
+        password.password_pool.use_processes = executor == "process"
+        password.password_pool.start()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    app = FastAPI()
+    app.include_router(users.router, prefix="/users")
+    transport = httpx.ASGITransport(app=app)
+    credentials = {"email": "bench@example.com", "password": "bench-password"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        r = await client.post("/users/register", json=credentials)
+        if r.status_code == 400:
+            r = await client.post("/users/login", json=credentials)
+        user_id = r.json()["user"]["id"]
+
+        # warm the pool so worker start-up is not measured
+        await client.post("/users/login", json=credentials)
+
+        login_latencies: List[float] = []
+        probe_latencies: List[float] = []
+        rejected = 0
+        done = asyncio.Event()
+        remaining = iter(range(requests))
+
+        async def login_worker():
+            nonlocal rejected
+            for _ in remaining:
+                t0 = time.perf_counter()
+                resp = await client.post("/users/login", json=credentials)
+                if resp.status_code == 503:
+                    rejected += 1
+                else:
+                    login_latencies.append(time.perf_counter() - t0)
+
+        async def probe():
+            while not done.is_set():
+                t0 = time.perf_counter()
+                await client.get(f"/users/user/{user_id}")
+                probe_latencies.append(time.perf_counter() - t0)
+                await asyncio.sleep(0.01)
+
+        started = time.perf_counter()
+        probe_task = asyncio.create_task(probe())
+        await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    print(f"executor={executor} concurrency={concurrency} workers={password.password_pool.workers}")
+    report("login", login_latencies, elapsed)
+    report("probe", probe_latencies, elapsed)
+    if rejected:
+        print(f"rejected {rejected} logins with 503 (queue full / max wait)")
+
+    password.password_pool.shutdown()
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--executor", choices=["process", "thread", "threadpool"], default="process")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(run(args.executor, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
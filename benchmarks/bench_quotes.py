@@ -0,0 +1,126 @@
+"""End-to-end /api/v1/travel/get-quotes load against the insurer simulator.
+
+Runs the real app (lifespan, token warm-up, circuits, quote cache, SSE
+fan-out and mapping) in-process, with every insurer call answered by
+benchmarks.insurer_simulator. Each request reads the whole SSE stream and
+counts as successful when every insurer event carries plans.
+
+    python -m benchmarks.bench_quotes --requests 500 --concurrency 64
+    python -m benchmarks.bench_quotes --median-ms 150 --p95-ms 900 --error-rate 0.05
+    python -m benchmarks.bench_quotes --distinct 20    # exercise the quote cache
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+from datetime import date, timedelta
+from typing import Any, Dict
+
+# an isolated SQLite file so the benchmark never touches the dev database
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench_quotes.db"
+)
+
+import httpx  # noqa: E402
+import orjson  # noqa: E402
+
+from app.api.v1.endpoints.third_party.travel.quote_cache import quote_cache  # noqa: E402
+from app.api.v1.endpoints.third_party.travel.resilience import circuits_status  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.harness import drive, report  # noqa: E402
+from benchmarks.insurer_simulator import Behaviour, InsurerSimulator  # noqa: E402
+
+
+def travel_request(variant: int) -> Dict[str, Any]:
+    # the traveller's date of birth makes each variant a distinct insurer request
+    start = date.today() + timedelta(days=30)
+    return {
+        "travel_details": {
+            "coverage_type": "Individual",
+            "plan_type": "Single Trip",
+            "travel_dates": {
+                "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=9)).isoformat(),
+            },
+            "cover_type": "Worldwide",
+            "travellers": [{
+                "first_name": "Bench",
+                "last_name": "Traveller",
+                "date_of_birth": (date(1960, 1, 1) + timedelta(days=variant)).isoformat(),
+            }],
+            "departure": "United Arab Emirates",
+            "destination": "France",
+        },
+        "personal_details": {
+            "first_name": "Bench",
+            "last_name": "Traveller",
+            "mobile_number": "0500000000",
+            "email": "bench@example.com",
+            "marketing_consent": "yes",
+        },
+    }
+
+
+def quotes_ok(body: bytes) -> bool:
+    events = [
+        orjson.loads(chunk.split(b"data: ", 1)[1])
+        for chunk in body.split(b"\n\n")
+        if b"data: " in chunk
+    ]
+    quotes = [e for e in events if "api" in e]
+    return bool(quotes) and all(
+        e["status"] == "ok" and not e["response"].get("error") and e["response"]["plans"]
+        for e in quotes
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    simulator = InsurerSimulator(
+        plans=args.plans,
+        extra_covers=args.extra_covers,
+        auth=Behaviour(median_ms=args.median_ms, p95_ms=args.p95_ms),
+        rating=Behaviour(median_ms=args.median_ms, p95_ms=args.p95_ms, error_rate=args.error_rate),
+    )
+
+    with simulator:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+                async def call(i: int) -> bool:
+                    variant = i % args.distinct if args.distinct else i
+                    resp = await client.post("/api/v1/travel/get-quotes", json=travel_request(variant))
+                    return resp.status_code == 200 and quotes_ok(resp.content)
+
+                # first call pays for the insurer login
+                await call(-1)
+                result = await drive(call, args.requests, args.concurrency)
+
+    print(
+        f"concurrency={args.concurrency} plans={args.plans} "
+        f"latency median={args.median_ms}ms p95={args.p95_ms}ms error_rate={args.error_rate}"
+    )
+    report("get-quotes", result.latencies, result.elapsed)
+    if result.failures:
+        print(f"{result.failures} requests without a full set of plans")
+    print(f"upstream calls {simulator.calls}")
+    print(f"quote cache    {quote_cache.stats()}")
+    print(f"circuits       {circuits_status()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--plans", type=int, default=6)
+    parser.add_argument("--extra-covers", type=int, default=0)
+    parser.add_argument("--median-ms", type=float, default=80.0)
+    parser.add_argument("--p95-ms", type=float, default=250.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--distinct", type=int, default=0, help="distinct payloads (0: all distinct)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Mapping throughput for RAK rating responses.
+
+Replays the recorded gettravelrating payload shape in benchmarks/payloads,
+scaled up to a large plan list with long cover lists, through the compiled
+coverage mapper and through the previous per-field linear scan for reference.
+
+    python -m benchmarks.bench_rak_mapping --plans 60 --extra-covers 120
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.api.v1.endpoints.third_party.travel.rak import (
+    RAK_COVERAGE_SPEC,
+    _extract_amount,
+    _map_plan_card,
+)
+from benchmarks.harness import report
+from benchmarks.insurer_simulator import load_plans
+
+
+# previous implementation: one linear scan with str() per CDM field
+def _legacy_map_plan_card(plan: Dict[str, Any]) -> Dict[str, Any]:
+    def find(cover_id: str) -> Optional[Dict[str, Any]]:
+        for c in plan.get("covers") or []:
+            if str(c.get("id")) == str(cover_id):
+                return c
+        return None
+
+    return {
+        "insurer_code": "RAK",
+        "insurer_name": "RAKINSURANCE",
+        "plan_name": plan.get("planName"),
+        "currency": "AED",
+        "premium_total": plan.get("total"),
+        "coverage_summary": {
+            section: {field: _extract_amount(find(cid)) for field, cid in fields.items()}
+            for section, fields in RAK_COVERAGE_SPEC.items()
+        },
+    }
+
+
+def bench(name: str, fn: Callable[[Dict[str, Any]], Any], plans: List[Dict[str, Any]], seconds: float) -> float:
+    # one sample per mapped response (all plans of one rating call)
+    samples: List[float] = []
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        for plan in plans:
+            fn(plan)
+        samples.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    rate = len(samples) * len(plans) / elapsed
+    report(name, samples, elapsed)
+    print(f"{'':<10} {rate:>12,.0f} plans/s")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plans", type=int, default=60)
+    parser.add_argument("--extra-covers", type=int, default=120)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    plans = load_plans(args.plans, args.extra_covers)
+    assert [_map_plan_card(p) for p in plans] == [_legacy_map_plan_card(p) for p in plans]
+
+    covers = sum(len(p["covers"]) for p in plans) // len(plans)
+    print(f"{len(plans)} plans x ~{covers} covers per response")
+    legacy = bench("legacy", _legacy_map_plan_card, plans, args.seconds)
+    compiled = bench("compiled", _map_plan_card, plans, args.seconds)
+    print(f"speed-up   {compiled / legacy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def report(name: str, samples: List[float], elapsed: float) -> None:
+    print(
+        f"{name:<10} n={len(samples):<6} {len(samples) / elapsed:>9.1f} req/s  "
+        f"p50={percentile(samples, 50) * 1000:8.2f}ms  "
+        f"p95={percentile(samples, 95) * 1000:8.2f}ms  "
+        f"p99={percentile(samples, 99) * 1000:8.2f}ms"
+    )
+
+
+@dataclass
+class LoadResult:
+    latencies: List[float] = field(default_factory=list)
+    failures: int = 0
+    elapsed: float = 0.0
+
+
+async def drive(
+    call: Callable[[int], Awaitable[bool]],
+    requests: int,
+    concurrency: int,
+) -> LoadResult:
+    # `concurrency` workers share `requests` calls; call(i) returns False on failure
+    result = LoadResult()
+    remaining = iter(range(requests))
+
+    async def worker():
+        for i in remaining:
+            t0 = time.perf_counter()
+            try:
+                ok = await call(i)
+            except Exception:
+                ok = False
+            if ok:
+                result.latencies.append(time.perf_counter() - t0)
+            else:
+                result.failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
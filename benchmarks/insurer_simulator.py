@@ -0,0 +1,178 @@
+"""In-process stand-in for the RAK, Gulf and Liva auth and rating APIs.
+
+Mounts an httpx mock transport under the shared insurer transport, so the app's
+real auth, token, circuit and mapping code runs end to end without network
+access. Rating responses replay the recorded RAK payload shape in
+benchmarks/payloads, scaled to the requested plan-list size. Latency follows
+a log-normal distribution given by its median and p95, and a configurable
+fraction of calls fails with a 5xx.
+
+    with InsurerSimulator(plans=12, rating=Behaviour(median_ms=120, p95_ms=400)):
+        ...  # drive the app
+"""
+import asyncio
+import copy
+import json
+import math
+import random
+import secrets
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from pydantic import BaseModel, ValidationError
+
+from app.api.v1.endpoints.third_party.travel import transport
+from app.api.v1.endpoints.third_party.travel.rak import RAK_RATING_URL
+from app.schemas.travel import RakRatingRequest
+
+PAYLOAD = Path(__file__).parent / "payloads" / "rak_gettravelrating.json"
+
+# seeded providers (app/db/seed.py) and rating endpoints
+RAK_AUTH_URL = "https://uat-connect.rakinsurance.com/login/authenticate"
+GULF_AUTH_URL = "https://gulf-insurance-pp.eu.auth0.com/oauth/token"
+LIVA_AUTH_URL = "https://uatproductsvc.livainsurance.ae/auth-token"
+# no Gulf / Liva rating adapter exists yet; these serve the same recorded
+# plan shape so a future adapter can be benchmarked the same way
+GULF_RATING_URL = "https://gulf-insurance-pp.eu.auth0.com/travel/rating"
+LIVA_RATING_URL = "https://uatproductsvc.livainsurance.ae/travel/rating"
+
+# rating bodies are checked like the real API would; a 400 means the adapter
+# built a request the insurer rejects
+RATING_SCHEMAS: Dict[str, type[BaseModel]] = {"rak": RakRatingRequest}
+
+
+def load_plans(plans: int, extra_covers: int = 0, seed: int = 7) -> List[Dict[str, Any]]:
+    recorded = json.loads(PAYLOAD.read_text())
+    rng = random.Random(seed)
+    out = []
+    for i in range(plans):
+        plan = copy.deepcopy(recorded[i % len(recorded)])
+        plan["planName"] = f"{plan['planName']} #{i}"
+        # pad with riders the CDM does not map, as large RAK responses do
+        for j in range(extra_covers):
+            plan["covers"].append(
+                {"id": 5000 + j, "name": f"Rider {j}", "limit": 1000, "values": []}
+            )
+        rng.shuffle(plan["covers"])
+        out.append(plan)
+    return out
+
+
+@dataclass
+class Behaviour:
+    median_ms: float = 0.0
+    p95_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+
+    def latency(self, rng: random.Random) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        if self.p95_ms <= self.median_ms:
+            return self.median_ms / 1000
+        # log-normal: p95 = median * exp(1.645 * sigma)
+        sigma = math.log(self.p95_ms / self.median_ms) / 1.645
+        return rng.lognormvariate(math.log(self.median_ms), sigma) / 1000
+
+
+Handler = Callable[[httpx.Request, str], Awaitable[httpx.Response]]
+
+
+@dataclass
+class InsurerSimulator:
+    plans: int = 6
+    extra_covers: int = 0
+    auth: Behaviour = field(default_factory=Behaviour)
+    rating: Behaviour = field(default_factory=Behaviour)
+    # per insurer overrides, e.g. {"rak": Behaviour(error_rate=0.2)}
+    overrides: Dict[str, Behaviour] = field(default_factory=dict)
+    token_ttl: int = 3600
+    seed: int = 7
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._plans = load_plans(self.plans, self.extra_covers, self.seed)
+        self._tokens: Dict[str, str] = {}
+        self.calls: Dict[str, int] = {}
+        self._routes: Dict[Tuple[str, str], Tuple[str, str, Handler]] = {}
+        for insurer, url, handler in (
+            ("rak", RAK_AUTH_URL, self._rak_auth),
+            ("gulf", GULF_AUTH_URL, self._oauth),
+            ("liva", LIVA_AUTH_URL, self._oauth),
+        ):
+            self._add(insurer, "auth", url, handler)
+        for insurer, url in (
+            ("rak", RAK_RATING_URL),
+            ("gulf", GULF_RATING_URL),
+            ("liva", LIVA_RATING_URL),
+        ):
+            self._add(insurer, "rating", url, self._rating)
+
+    def _add(self, insurer: str, operation: str, url: str, handler: Handler) -> None:
+        parts = urlsplit(url)
+        self._routes[(parts.netloc, parts.path)] = (insurer, operation, handler)
+
+    # -- install into the shared transport ----------------------------------
+
+    def install(self) -> "InsurerSimulator":
+        transport.set_transport(httpx.MockTransport(self.handle))
+        return self
+
+    def uninstall(self) -> None:
+        transport.set_transport(None)
+
+    def __enter__(self) -> "InsurerSimulator":
+        return self.install()
+
+    def __exit__(self, *exc) -> None:
+        self.uninstall()
+
+    # -- request handling ---------------------------------------------------
+
+    def behaviour(self, insurer: str, operation: str) -> Behaviour:
+        return self.overrides.get(insurer) or (self.auth if operation == "auth" else self.rating)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        route = self._routes.get((request.url.netloc.decode(), request.url.path))
+        if route is None:
+            return httpx.Response(404, json={"error": f"simulator: no route for {request.url}"})
+
+        insurer, operation, handler = route
+        name = f"{insurer}:{operation}"
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+        behaviour = self.behaviour(insurer, operation)
+        await asyncio.sleep(behaviour.latency(self._rng))
+        if self._rng.random() < behaviour.error_rate:
+            return httpx.Response(behaviour.error_status, json={"error": "simulated failure"})
+        return await handler(request, insurer)
+
+    def _issue(self, insurer: str) -> str:
+        token = secrets.token_hex(16)
+        self._tokens[insurer] = token
+        return token
+
+    async def _rak_auth(self, request: httpx.Request, insurer: str) -> httpx.Response:
+        return httpx.Response(200, json={"token": self._issue(insurer)})
+
+    async def _oauth(self, request: httpx.Request, insurer: str) -> httpx.Response:
+        return httpx.Response(200, json={
+            "access_token": self._issue(insurer),
+            "token_type": "Bearer",
+            "expires_in": self.token_ttl,
+        })
+
+    async def _rating(self, request: httpx.Request, insurer: str) -> httpx.Response:
+        expected = self._tokens.get(insurer)
+        if expected is None or request.headers.get("Authorization") != f"Bearer {expected}":
+            return httpx.Response(401, json={"error": "invalid token"})
+        schema = RATING_SCHEMAS.get(insurer)
+        if schema is not None:
+            try:
+                schema.model_validate_json(request.content)
+            except ValidationError as exc:
+                return httpx.Response(400, json={"error": f"invalid request: {exc}"})
+        return httpx.Response(200, json=self._plans)
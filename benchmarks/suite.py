@@ -0,0 +1,45 @@
+"""Run every benchmark with one set of load settings.
+
+Each benchmark runs in its own interpreter (fresh process-wide caches, pools
+and SQLite file), one after another:
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --requests 1000 --concurrency 64 --only quotes login
+"""
+import argparse
+import subprocess
+import sys
+from typing import Dict, List
+
+
+def commands(args: argparse.Namespace) -> Dict[str, List[str]]:
+    load = ["--requests", str(args.requests), "--concurrency", str(args.concurrency)]
+    return {
+        "mapping": ["benchmarks.bench_rak_mapping", "--seconds", str(args.seconds)],
+        "quotes": ["benchmarks.bench_quotes", *load],
+        "login": ["benchmarks.bench_login", *load],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=2.0, help="mapping benchmark duration")
+    parser.add_argument("--only", nargs="*", choices=["mapping", "quotes", "login"])
+    args = parser.parse_args()
+
+    failed = []
+    for name, command in commands(args).items():
+        if args.only and name not in args.only:
+            continue
+        print(f"\n=== {name} ===", flush=True)
+        if subprocess.call([sys.executable, "-m", *command]) != 0:
+            failed.append(name)
+
+    if failed:
+        sys.exit(f"failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
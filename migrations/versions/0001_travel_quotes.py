@@ -0,0 +1,46 @@
+"""travel quotes
+
+Revision ID: 0001_travel_quotes
+Revises:
+Create Date: 2026-10-16 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_travel_quotes"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# users and third_party_auth predate migrations (created by create_all at
+# startup, see app/db/migrate.py); everything from here on is Alembic's
+
+JSON_TYPE = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "travel_quotes",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("insurer", sa.String(length=20), nullable=False),
+        sa.Column("fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("plan_name", sa.String(length=255), nullable=True),
+        sa.Column("premium_total", sa.Numeric(12, 2), nullable=True),
+        sa.Column("currency", sa.String(length=3), nullable=True),
+        sa.Column("plan", JSON_TYPE, nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_travel_quotes_insurer", "travel_quotes", ["insurer"])
+    op.create_index("ix_travel_quotes_fingerprint", "travel_quotes", ["fingerprint"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_travel_quotes_fingerprint", table_name="travel_quotes")
+    op.drop_index("ix_travel_quotes_insurer", table_name="travel_quotes")
+    op.drop_table("travel_quotes")
@@ -0,0 +1,65 @@
+import os
+import tempfile
+
+# Settings() requires insurer credentials; tests never talk to real insurers.
+for _name in (
+    "RAK_USER_NAME",
+    "RAK_PASSWORD",
+    "GULF_CLIENT_ID",
+    "GULF_CLIENT_SECRET",
+    "LIVA_CLIENT_ID",
+    "LIVA_CLIENT_SECRET",
+    "LIVA_SCOPE",
+    "LIVA_LOCATION",
+    "LIVA_AUTHKEY",
+    "LIVA_LANGUAGE",
+    "LIVA_PARTNERID",
+    "LIVA_SUBSCRIPTIONKEY",
+):
+    os.environ.setdefault(_name, "test")
+
+# keep the app's SQLite file out of the working tree
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db")
+
+# app imports read settings, so they come after the environment above
+import asyncio
+
+import pytest
+from sqlalchemy import inspect, pool, select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.api.v1.endpoints.third_party.travel.auth import TOKEN_FIELDS
+from app.api.v1.endpoints.third_party.travel.quote_cache import quote_cache
+from app.api.v1.endpoints.third_party.travel.resilience import reset_circuits
+from app.api.v1.endpoints.third_party.travel.scheduler import reset_limiters
+from app.api.v1.endpoints.third_party.travel.token_manager import token_manager
+from app.core.config import settings
+from app.db.models.third_party_api import ThirdPartyAuth
+
+
+async def _forget_persisted_tokens() -> None:
+    # insurer tokens persisted by an earlier test's simulator are unknown to
+    # the next one
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
+    stale = {*TOKEN_FIELDS.values(), "token_expires_at"}
+    async with engine.begin() as conn:
+        if await conn.run_sync(lambda c: inspect(c).has_table(ThirdPartyAuth.__tablename__)):
+            rows = await conn.execute(select(ThirdPartyAuth.id, ThirdPartyAuth.auth_config))
+            for provider_id, auth_config in rows.all():
+                await conn.execute(
+                    update(ThirdPartyAuth)
+                    .where(ThirdPartyAuth.id == provider_id)
+                    .values(auth_config={k: v for k, v in (auth_config or {}).items() if k not in stale})
+                )
+    await engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def fresh_insurer_state():
+    # process-wide singletons outlive each test's event loop and simulator
+    token_manager.reset()
+    quote_cache.clear()
+    reset_circuits()
+    reset_limiters()
+    asyncio.run(_forget_persisted_tokens())
+    yield
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils.admission import AdmissionController, AdmissionRejected, quote_admission
+from app.utils.security import create_access_token
+from benchmarks.bench_quotes import travel_request
+
+
+def test_partner_share_caps_one_broker_without_blocking_others():
+    async def scenario():
+        admission = AdmissionController("test", max_in_flight=2, max_queue=2, max_wait=1, partner_share=0.5)
+        await admission.acquire("acme")
+
+        # acme is at its share: it queues, and may not take over the queue
+        queued = asyncio.create_task(admission.acquire("acme"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as exc:
+            await admission.acquire("acme")
+        assert exc.value.reason == "partner_limit"
+
+        # everyone else still gets the free slot straight away
+        assert await admission.acquire(None) == 0.0
+        assert admission.status()["in_flight"] == 2
+
+        # a blocked acme waiter does not hold up a later request from beta
+        beta = asyncio.create_task(admission.acquire("beta"))
+        await asyncio.sleep(0)
+        admission.release(None)
+        await beta
+        assert not queued.done()
+
+        admission.release("acme")
+        await queued
+        return admission.status()
+
+    status = asyncio.run(scenario())
+    assert status["partners"] == {"acme": 1, "beta": 1}
+    assert status["rejected"] == {"partner_limit": 1}
+
+
+def test_full_queue_and_slow_slots_are_rejected():
+    async def scenario():
+        admission = AdmissionController("test", max_in_flight=1, max_queue=1, max_wait=0.05)
+        await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as full:
+            await admission.acquire()
+        with pytest.raises(AdmissionRejected) as slow:
+            await waiter
+        return full.value.reason, slow.value.reason, admission.status()
+
+    full, slow, status = asyncio.run(scenario())
+    assert (full, slow) == ("queue_full", "timeout")
+    assert status["in_flight"] == 1 and status["queued"] == 0
+
+
+def test_get_quotes_sheds_load_with_retry_after(monkeypatch):
+    monkeypatch.setattr(quote_admission, "max_in_flight", 0)
+    monkeypatch.setattr(quote_admission, "max_queue", 0)
+
+    r = TestClient(app).post("/api/v1/travel/get-quotes", json=travel_request(0))
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == str(quote_admission.retry_after)
+    assert quote_admission.status()["in_flight"] == 0
+
+
+def test_fair_share_is_keyed_on_the_verified_token_not_partner_code(monkeypatch):
+    seen = []
+
+    async def acquire(partner=None):
+        seen.append(partner)
+        raise AdmissionRejected("queue_full", 1)
+
+    monkeypatch.setattr(quote_admission, "acquire", acquire)
+    body = travel_request(0)
+    body["personal_details"]["partner_code"] = "spoofed"
+    client = TestClient(app)
+
+    client.post("/api/v1/travel/get-quotes", json=body)
+    token = create_access_token({"sub": "broker@example.com"})
+    client.post("/api/v1/travel/get-quotes", json=body, headers={"Authorization": f"Bearer {token}"})
+    client.post("/api/v1/travel/get-quotes", json=body, headers={"Authorization": "Bearer forged"})
+
+    assert seen == [None, "broker@example.com", None]
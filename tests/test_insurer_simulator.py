@@ -0,0 +1,93 @@
+import asyncio
+
+import httpx
+import orjson
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints.third_party.travel.rak import RAK_RATING_URL, build_rak_request
+from app.api.v1.endpoints.third_party.travel.registry import get_adapters
+from app.main import app
+from app.schemas.travel import PlanCard, TravelInsuranceRequest
+from benchmarks.bench_quotes import travel_request
+from benchmarks.insurer_simulator import RAK_AUTH_URL, Behaviour, InsurerSimulator
+
+
+def _events(body: bytes):
+    return [
+        orjson.loads(chunk.split(b"data: ", 1)[1])
+        for chunk in body.split(b"\n\n")
+        if b"data: " in chunk
+    ]
+
+
+def test_get_quotes_end_to_end_against_simulator():
+    with InsurerSimulator(plans=9) as simulator, TestClient(app) as client:
+        r = client.post("/api/v1/travel/get-quotes", json=travel_request(1))
+        assert r.status_code == 200
+
+        rak = next(e for e in _events(r.content) if e.get("api") == "rak")
+        assert rak["status"] == "ok"
+        assert rak["response"]["error"] is None
+        assert len(rak["response"]["plans"]) == 9
+        assert simulator.calls["rak:rating"] == 1
+
+        # identical request is served from the quote cache, with the same quote IDs
+        again = client.post("/api/v1/travel/get-quotes", json=travel_request(1))
+        assert simulator.calls["rak:rating"] == 1
+        cached = next(e for e in _events(again.content) if e.get("api") == "rak")
+        plan = rak["response"]["plans"][0]
+        assert cached["response"]["plans"][0]["quote_id"] == plan["quote_id"]
+
+        # and each priced plan can be fetched back without calling the insurer
+        r = client.get(f"/api/v1/travel/quotes/{plan['quote_id']}")
+        assert r.status_code == 200
+        assert r.json()["plan"] == plan
+        assert client.get("/api/v1/travel/quotes/unknown").status_code == 404
+        assert simulator.calls["rak:rating"] == 1
+
+
+def test_simulated_upstream_errors_surface_as_error_cards():
+    failing = InsurerSimulator(rating=Behaviour(error_rate=1.0))
+    with failing, TestClient(app) as client:
+        r = client.post("/api/v1/travel/get-quotes", json=travel_request(2))
+        events = _events(r.content)
+        rak = next(e for e in events if e.get("api") == "rak")
+        assert rak["status"] == "error"
+        assert rak["response"]["plans"] == []
+        assert rak["response"]["error"]
+        # the per-source summary must not report the failed insurer as ok
+        assert events[-1]["sources"]["rak"]["status"] == "error"
+
+
+def test_every_registered_adapter_streams_canonical_plan_cards():
+    with InsurerSimulator(plans=5), TestClient(app) as client:
+        r = client.post("/api/v1/travel/get-quotes", json=travel_request(4))
+    events = {e["api"]: e for e in _events(r.content) if "api" in e}
+
+    for adapter in get_adapters():
+        # a new adapter needs simulator routes before it can be registered
+        event = events[adapter.code]
+        assert event["status"] == "ok", event
+        plans = event["response"]["plans"]
+        assert plans, event["response"]["error"]
+        for plan in plans:
+            # exactly the PlanCard fields, nothing missing and nothing extra
+            assert PlanCard.model_validate(plan).model_dump() == plan
+
+
+def test_simulator_rejects_a_rating_body_outside_the_rak_schema():
+    simulator = InsurerSimulator()
+
+    async def rate(body):
+        login = await simulator.handle(httpx.Request("POST", RAK_AUTH_URL, json={}))
+        headers = {"Authorization": f"Bearer {login.json()['token']}"}
+        request = httpx.Request("POST", RAK_RATING_URL, headers=headers, json=body)
+        return await simulator.handle(request)
+
+    body = build_rak_request(TravelInsuranceRequest(**travel_request(5)))
+    assert asyncio.run(rate(body)).status_code == 200
+
+    del body["tripStartDate"]
+    r = asyncio.run(rate(body))
+    assert r.status_code == 400
+    assert "tripStartDate" in r.json()["error"]
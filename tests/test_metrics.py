@@ -0,0 +1,82 @@
+import asyncio
+from contextlib import contextmanager
+
+import httpx
+
+from app.api.v1.endpoints.third_party.travel import transport
+from app.utils import metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = metrics.Histogram("demo_seconds", "demo", ("insurer",), buckets=(0.1, 1.0))
+    hist.observe(0.05, insurer="rak")
+    hist.observe(0.5, insurer="rak")
+    hist.observe(5.0, insurer="rak")
+
+    lines = hist.render()
+    assert 'demo_seconds_bucket{insurer="rak",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{insurer="rak",le="1.0"} 2' in lines
+    assert 'demo_seconds_bucket{insurer="rak",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{insurer="rak"} 3' in lines
+
+
+def test_stage_hooks_only_wrap_sampled_requests():
+    seen = []
+
+    @contextmanager
+    def hook(name, labels):
+        seen.append((name, labels["insurer"]))
+        yield
+
+    metrics.register_stage_hook(hook)
+    try:
+        before = metrics.QUOTE_STAGE_SECONDS.count(insurer="test", stage="map")
+
+        metrics.sample_request()  # sample rate defaults to 0
+        with metrics.stage("map", "test"):
+            pass
+        assert seen == []
+
+        metrics.sample_request(force=True)
+        with metrics.stage("map", "test"):
+            pass
+        assert seen == [("map", "test")]
+
+        assert metrics.QUOTE_STAGE_SECONDS.count(insurer="test", stage="map") == before + 2
+    finally:
+        metrics.unregister_stage_hook(hook)
+        metrics.sample_request()
+
+
+def test_transport_records_upstream_status_codes():
+    url = "https://metrics-test.example/rating"
+    key = transport._host_key(url)
+    transport._clients[key] = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(503))
+    )
+
+    async def scenario():
+        try:
+            return await transport.post(url, insurer="demo", operation="rating")
+        finally:
+            await transport._clients.pop(key).aclose()
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 503
+    assert metrics.INSURER_REQUESTS_TOTAL.value(insurer="demo", operation="rating", status="503") == 1
+    assert 'insurer_requests_total{insurer="demo",operation="rating",status="503"} 1.0' in metrics.render()
+
+
+def test_cprofile_hook_profiles_one_synchronous_stage_at_a_time(capsys):
+    labels = {"insurer": "rak"}
+    with metrics.cprofile_stage_hook("upstream", labels):
+        pass
+    assert "[PROFILE]" not in capsys.readouterr().out
+
+    # a second profiler would clobber the first one's hook
+    with metrics.cprofile_stage_hook("map", labels):
+        with metrics.cprofile_stage_hook("decode", labels):
+            sum(range(1000))
+    out = capsys.readouterr().out
+    assert out.count("[PROFILE]") == 1
+    assert "stage=map" in out
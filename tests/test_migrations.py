@@ -0,0 +1,35 @@
+import asyncio
+import tempfile
+
+from alembic import command
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.migrate import alembic_config, create_schema, startup_tables
+from app.db.models.quote import TravelQuote
+
+
+def _tables(conn):
+    return set(inspect(conn).get_table_names())
+
+
+def test_startup_leaves_travel_quotes_to_alembic_and_is_repeatable():
+    assert TravelQuote.__table__ not in startup_tables()
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/schema.db")
+        for _ in range(2):
+            # a second boot (or a manual `alembic upgrade head`) finds nothing to do
+            async with engine.begin() as conn:
+                await conn.run_sync(create_schema)
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda c: command.upgrade(alembic_config(c), "head"))
+            tables = await conn.run_sync(_tables)
+            version = await conn.scalar(text("SELECT version_num FROM alembic_version"))
+        await engine.dispose()
+        return tables, version
+
+    tables, version = asyncio.run(scenario())
+    assert {"users", "third_party_auth", "travel_quotes"} <= tables
+    assert version == "0001_travel_quotes"
+
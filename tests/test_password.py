@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import users
+from app.main import app
+from app.utils import security
+from app.utils.password import PasswordHasherBusy, PasswordHashPool
+from benchmarks.insurer_simulator import InsurerSimulator
+
+
+def _pool(**kwargs):
+    return PasswordHashPool(use_processes=False, **{"workers": 1, **kwargs})
+
+
+def test_pool_rejects_when_the_queue_is_full():
+    async def scenario():
+        pool = _pool(max_queue=1, max_wait=5)
+        try:
+            busy = asyncio.create_task(pool.run(time.sleep, 0.2))
+            await asyncio.sleep(0.01)
+            queued = asyncio.create_task(pool.run(time.sleep, 0))
+            await asyncio.sleep(0.01)
+            with pytest.raises(PasswordHasherBusy, match="queue is full"):
+                await pool.run(time.sleep, 0)
+            await asyncio.gather(busy, queued)
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_pool_gives_up_after_max_wait():
+    async def scenario():
+        pool = _pool(max_queue=5, max_wait=0.05)
+        try:
+            busy = asyncio.create_task(pool.run(time.sleep, 0.3))
+            await asyncio.sleep(0.01)
+            with pytest.raises(PasswordHasherBusy, match="Timed out"):
+                await pool.run(time.sleep, 0)
+            await busy
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_register_and_login_answer_503_with_retry_after_when_busy(monkeypatch):
+    async def busy(*args):
+        raise PasswordHasherBusy("Password hashing queue is full")
+
+    credentials = {"email": "busy-test@example.com", "password": "s3cret-pass"}
+    with InsurerSimulator(), TestClient(app) as client:
+        assert client.post("/api/v1/users/register", json=credentials).status_code == 200
+
+        monkeypatch.setattr(users, "get_password_hash_async", busy)
+        monkeypatch.setattr(users, "verify_password_async", busy)
+        for path, body in (
+            ("/api/v1/users/register", {**credentials, "email": "busy-2@example.com"}),
+            ("/api/v1/users/login", credentials),
+        ):
+            r = client.post(path, json=body)
+            assert r.status_code == 503
+            assert r.headers["Retry-After"] == "1"
+
+
+def test_cached_claims_never_outlive_the_token(monkeypatch):
+    monkeypatch.setattr(security, "_verified_tokens", type(security._verified_tokens)())
+
+    security._cache_claims("expired", {"sub": "a", "exp": time.time() - 1})
+    assert security._cached_claims("expired") is None
+
+    security._cache_claims("short", {"sub": "a", "exp": time.time() + 5})
+    security._cache_claims("long", {"sub": "a", "exp": time.time() + 3600})
+    short_until = security._verified_tokens["short"][0]
+    long_until = security._verified_tokens["long"][0]
+    assert short_until <= time.time() + 5
+    assert long_until <= time.time() + security.verified_token_cache_ttl
+    assert security._cached_claims("long")["sub"] == "a"
+
+
+def test_verified_token_is_served_from_the_cache(monkeypatch):
+    monkeypatch.setattr(security, "_verified_tokens", type(security._verified_tokens)())
+    token = security.create_access_token({"sub": "cached@example.com"})
+    assert security.verify_access_token(token)["sub"] == "cached@example.com"
+
+    def no_decode(*args, **kwargs):
+        raise AssertionError("signature checked again")
+
+    monkeypatch.setattr(security.jwt, "decode", no_decode)
+    assert security.verify_access_token(token)["sub"] == "cached@example.com"
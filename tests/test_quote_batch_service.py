@@ -0,0 +1,105 @@
+import asyncio
+from typing import Any, Dict, List
+
+import orjson
+
+from app.api.v1.endpoints.third_party.travel.base import InsurerAdapter
+from app.api.v1.endpoints.third_party.travel.errors import InsurerError
+from app.schemas.travel import TravelInsuranceRequest
+from app.services import quote_batch_service
+from app.services.quote_batch_service import QuoteBatchService
+from benchmarks.bench_quotes import travel_request
+
+
+class _FakeAdapter(InsurerAdapter):
+    code = "fake"
+    insurer = "FAKE"
+    insurer_name = "Fake Insurance"
+
+    def __init__(self):
+        self.calls: List[Dict[str, Any]] = []
+
+    def build_request(self, payload: TravelInsuranceRequest) -> Dict[str, Any]:
+        traveller = payload.travel_details.travellers[0]
+        if traveller.first_name == "Broken":
+            raise ValueError("no rating for this traveller")
+        return {"dob": traveller.date_of_birth.isoformat()}
+
+    async def call(self, request_body: Dict[str, Any]) -> Any:
+        self.calls.append(request_body)
+        await asyncio.sleep(0.01)
+        return [{"name": f"Plan for {request_body['dob']}"}]
+
+    def map_plans(self, raw_response: Any) -> List[Dict[str, Any]]:
+        return [{"plan_name": plan["name"]} for plan in raw_response]
+
+
+def _requests():
+    broken = travel_request(3)
+    broken["travel_details"]["travellers"][0]["first_name"] = "Broken"
+    # 0 and 2 normalise to the same insurer body
+    raw = [travel_request(1), travel_request(2), travel_request(1), broken]
+    return [TravelInsuranceRequest(**r) for r in raw]
+
+
+def _run(requests):
+    async def collect():
+        return [orjson.loads(line) async for line in QuoteBatchService.stream(requests)]
+
+    return asyncio.run(collect())
+
+
+def test_batch_dedups_fans_out_and_summarises(monkeypatch):
+    adapter = _FakeAdapter()
+    monkeypatch.setattr(quote_batch_service, "get_adapters", lambda: [adapter])
+    monkeypatch.setattr(quote_batch_service.settings, "QUOTE_STORE_ENABLED", False)
+
+    lines = _run(_requests())
+    results = {line["index"]: line for line in lines if "index" in line}
+    summary = lines[-1]["summary"]
+
+    # build failures come first, as their own lines
+    assert lines[0] == {
+        "index": 3,
+        "api": "fake",
+        "status": "error",
+        "error": "Could not build FAKE request: no rating for this traveller",
+    }
+    # one insurer call for the duplicate pair, its result fanned out to both
+    assert len(adapter.calls) == 2
+    assert results[0]["response"] == results[2]["response"]
+    assert results[0]["response"]["plans"] != results[1]["response"]["plans"]
+    assert summary["requests"] == 4
+    assert summary["distinct_requests"] == 2
+    assert summary["upstream_calls"] == 2
+    assert summary["deduplicated"] == 1
+    assert summary["statuses"] == {"ok": 2}
+
+    # the same batch again is served by the quote cache: no upstream calls
+    summary = _run(_requests())[-1]["summary"]
+    assert len(adapter.calls) == 2
+    assert summary["distinct_requests"] == 2
+    assert summary["upstream_calls"] == 0
+
+
+def test_plan_jobs_groups_indices_by_fingerprint():
+    adapter = _FakeAdapter()
+    jobs, failures = QuoteBatchService.plan_jobs(_requests(), [adapter])
+
+    assert sorted(indices for _, _, indices in jobs) == [[0, 2], [1]]
+    assert [failure["index"] for failure in failures] == [3]
+
+
+def test_failing_insurer_is_counted_as_error(monkeypatch):
+    class _FailingAdapter(_FakeAdapter):
+        async def call(self, request_body: Dict[str, Any]) -> Any:
+            raise InsurerError("FAKE rating failed with HTTP 503")
+
+    monkeypatch.setattr(quote_batch_service, "get_adapters", lambda: [_FailingAdapter()])
+
+    lines = _run(_requests()[:2])
+    results = [line for line in lines if "index" in line]
+
+    assert {line["status"] for line in results} == {"error"}
+    assert all(line["response"]["error"] for line in results)
+    assert lines[-1]["summary"]["statuses"] == {"error": 2}
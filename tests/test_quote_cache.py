@@ -0,0 +1,114 @@
+import asyncio
+
+from app.api.v1.endpoints.third_party.travel.quote_cache import QuoteCache
+
+
+def _counting_fetch(calls, result=None, delay=0.01):
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result or {"insurer": "RAK", "plans": [{"plan_name": "Gold"}], "error": None}
+
+    return fetch
+
+
+def test_identical_concurrent_requests_make_one_upstream_call():
+    cache = QuoteCache(max_entries=10, default_ttl=60)
+    calls = []
+    body = {"tripStartDate": "2025-01-01", "travellerInfo": [{"name": "A"}]}
+
+    async def scenario():
+        return await asyncio.gather(
+            *(cache.get_or_fetch("rak", dict(body), _counting_fetch(calls)) for _ in range(50))
+        )
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(r["plans"][0]["plan_name"] == "Gold" for r in results)
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["coalesced"] == 49
+
+    asyncio.run(cache.get_or_fetch("rak", body, _counting_fetch(calls)))
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_key_ignores_dict_ordering():
+    cache = QuoteCache(max_entries=10, default_ttl=60)
+    calls = []
+
+    async def scenario():
+        await cache.get_or_fetch("rak", {"a": 1, "b": 2}, _counting_fetch(calls))
+        await cache.get_or_fetch("rak", {"b": 2, "a": 1}, _counting_fetch(calls))
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+
+
+def test_lru_eviction_and_per_insurer_ttl():
+    cache = QuoteCache(max_entries=2, default_ttl=60, ttl_overrides={"GULF": 0})
+    calls = []
+
+    async def scenario():
+        for i in range(3):
+            await cache.get_or_fetch("rak", {"i": i}, _counting_fetch(calls))
+        # ttl 0 disables caching for gulf
+        await cache.get_or_fetch("gulf", {"i": 0}, _counting_fetch(calls))
+        await cache.get_or_fetch("gulf", {"i": 0}, _counting_fetch(calls))
+
+    asyncio.run(scenario())
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+    assert len(calls) == 5
+
+
+def test_error_responses_are_not_cached():
+    cache = QuoteCache(max_entries=10, default_ttl=60)
+    calls = []
+    failed = {"insurer": "RAK", "plans": [], "error": "Request to RAK failed"}
+
+    async def scenario():
+        await cache.get_or_fetch("rak", {"a": 1}, _counting_fetch(calls, failed))
+        await cache.get_or_fetch("rak", {"a": 1}, _counting_fetch(calls, failed))
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+    assert cache.stats()["size"] == 0
+
+
+def test_upstream_fetch_is_cancelled_once_every_waiter_has_left():
+    cache = QuoteCache(max_entries=10, default_ttl=60)
+    fetches = []
+
+    async def slow_fetch():
+        fetches.append("started")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            fetches.append("cancelled")
+            raise
+        return {"insurer": "RAK", "plans": [], "error": None}
+
+    async def scenario():
+        first = asyncio.create_task(cache.get_or_fetch("rak", {"a": 1}, slow_fetch))
+        second = asyncio.create_task(cache.get_or_fetch("rak", {"a": 1}, slow_fetch))
+        await asyncio.sleep(0.01)
+
+        # one caller leaving keeps the shared fetch going for the other
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert fetches == ["started"]
+
+        # the last one leaving (deadline) stops it
+        try:
+            async with asyncio.timeout(0.01):
+                await second
+        except TimeoutError:
+            pass
+        await asyncio.sleep(0.01)
+        return cache.stats()
+
+    stats = asyncio.run(scenario())
+    assert fetches == ["started", "cancelled"]
+    assert stats["in_flight"] == 0 and stats["size"] == 0
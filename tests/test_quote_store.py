@@ -0,0 +1,134 @@
+import asyncio
+import tempfile
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models.quote import TravelQuote
+from app.services.quote_store import QuoteStore
+from app.utils.metrics import QUOTE_STORE_DROPPED_TOTAL
+
+
+def _plans(n):
+    return [
+        {"plan_name": f"Plan {i}", "premium_total": 100 + i, "currency": "AED"}
+        for i in range(n)
+    ]
+
+
+def test_quotes_are_retrievable_before_and_after_bulk_flush():
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/quotes.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+        store = QuoteStore(session_factory=sessions, batch_size=2, flush_seconds=60)
+        store.start()
+        plans = store.record("rak", {"tripType": "S"}, _plans(5))
+        quote_ids = [p["quote_id"] for p in plans]
+        assert len(set(quote_ids)) == 5
+
+        # not flushed yet: served from memory
+        pending = await store.get(quote_ids[0])
+        assert pending["plan"]["plan_name"] == "Plan 0"
+
+        await store.close()
+        assert store.stats() == {"queued": 0, "written": 5, "dropped": 0, "failed": 0}
+
+        stored = await store.get(quote_ids[4])
+        assert stored["insurer"] == "rak"
+        assert stored["plan"]["quote_id"] == quote_ids[4]
+        async with sessions() as db:
+            count = await db.scalar(select(func.count()).select_from(TravelQuote))
+        await engine.dispose()
+        return count
+
+    assert asyncio.run(scenario()) == 5
+
+
+def test_full_queue_drops_instead_of_blocking():
+    store = QuoteStore(session_factory=None, max_pending=3)
+    store.record("rak", {}, _plans(2))
+    plans = store.record("rak", {}, _plans(2))
+    # dropped plans are still streamed, but without an ID that would 404
+    assert not any("quote_id" in p for p in plans)
+    assert store.stats()["queued"] == 2
+    assert store.stats()["dropped"] == 2
+
+
+def test_failed_insert_keeps_quotes_retrievable_and_retries():
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/quotes.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        outage = {"left": 2}
+
+        def flaky_sessions():
+            if outage["left"]:
+                outage["left"] -= 1
+                raise ConnectionError("database unavailable")
+            return sessions()
+
+        store = QuoteStore(session_factory=flaky_sessions, batch_size=10, flush_seconds=0.01)
+        store.start()
+        quote_ids = [p["quote_id"] for p in store.record("rak", {}, _plans(3))]
+
+        while outage["left"]:
+            await asyncio.sleep(0.01)
+        # both attempts failed; the rows are still queued and served from memory
+        assert store.stats()["failed"] == 6
+        assert (await store.get(quote_ids[0]))["plan"]["plan_name"] == "Plan 0"
+
+        await store.close()
+        stats = store.stats()
+        stored = [await store.get(quote_id) for quote_id in quote_ids]
+        await engine.dispose()
+        return stats, stored
+
+    stats, stored = asyncio.run(scenario())
+    assert stats == {"queued": 0, "written": 3, "dropped": 0, "failed": 6}
+    assert all(quote is not None for quote in stored)
+
+
+def test_row_that_never_inserts_is_dropped_after_capped_retries():
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/quotes.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+        store = QuoteStore(session_factory=sessions, batch_size=10, flush_seconds=0.01)
+        quote_ids = [p["quote_id"] for p in store.record("rak", {}, _plans(3))]
+        # a row already taken by its primary key: every batch holding it fails
+        async with sessions() as db:
+            db.add(TravelQuote(
+                id=quote_ids[1], insurer="rak", fingerprint="x", plan={},
+                created_at=datetime.now(timezone.utc),
+            ))
+            await db.commit()
+        before = QUOTE_STORE_DROPPED_TOTAL.value(insurer="rak", reason="insert_failed")
+
+        store.start()
+        while store.stats()["queued"]:
+            await asyncio.sleep(0.01)
+        later = store.record("rak", {}, _plans(1))[0]["quote_id"]
+        await store.close()
+
+        dropped = QUOTE_STORE_DROPPED_TOTAL.value(insurer="rak", reason="insert_failed") - before
+        stored = [await store.get(quote_id) for quote_id in quote_ids + [later]]
+        stats = store.stats()
+        await engine.dispose()
+        return stats, dropped, stored
+
+    stats, dropped, stored = asyncio.run(scenario())
+    # the good rows and the quotes queued behind them are written
+    assert stats["written"] == 3
+    assert stats["dropped"] == 1
+    assert stats["failed"] == 9
+    assert dropped == 1
+    assert stored[0]["plan"]["plan_name"] == "Plan 0"
+    assert stored[3] is not None
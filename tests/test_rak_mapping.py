@@ -0,0 +1,94 @@
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+
+from app.api.v1.endpoints.third_party.travel import rak, transport
+from app.api.v1.endpoints.third_party.travel.mapping import compile_coverage_spec
+from app.api.v1.endpoints.third_party.travel.quote_cache import quote_cache, request_fingerprint
+from app.api.v1.endpoints.third_party.travel.rak import (
+    RAK_COVERAGE_SPEC,
+    _extract_amount,
+    _map_plan_card,
+    build_rak_request,
+)
+from app.schemas.travel import CoverageSummary, PlanCard, RakRatingRequest, TravelInsuranceRequest
+from benchmarks.bench_quotes import travel_request
+
+PAYLOAD = Path(__file__).parent.parent / "benchmarks" / "payloads" / "rak_gettravelrating.json"
+
+
+def test_recorded_plan_maps_to_canonical_card():
+    plans = json.loads(PAYLOAD.read_text())
+    card = _map_plan_card(plans[0])
+
+    assert card["plan_name"] == "RAK Travel Basic"
+    assert list(card["coverage_summary"]) == ["emergency", "accident", "additional"]
+    assert card["coverage_summary"]["emergency"]["emergency_medical_amount"].startswith("USD ")
+    # Basic has no luggage delay / lost ID cover
+    assert card["coverage_summary"]["additional"]["delayed_baggage_amount"] is None
+    assert card["coverage_summary"]["additional"]["loss_of_id_amount"] is None
+    assert PlanCard.model_validate(card).model_dump(exclude={"quote_id"}) == card
+
+
+def test_coverage_spec_matches_canonical_summary():
+    for section, fields in RAK_COVERAGE_SPEC.items():
+        model = CoverageSummary.model_fields[section].annotation
+        assert set(fields) == set(model.model_fields)
+
+
+def test_request_body_is_built_from_typed_payload():
+    raw = travel_request(0)
+    raw["travel_details"]["coverage_type"] = "Worldwide"
+    raw["travel_details"]["travellers"].append(
+        {"first_name": " Second ", "last_name": "Traveller", "date_of_birth": "1990-02-03"}
+    )
+    payload = TravelInsuranceRequest(**raw)
+    body = build_rak_request(payload)
+
+    # JSON-ready and exactly what the typed schema would serialize
+    assert RakRatingRequest.model_validate(body).model_dump(mode="json") == body
+    dates = payload.travel_details.travel_dates
+    assert body["tripStartDate"] == dates.start_date.isoformat()
+    assert body["tripDuration"] == (dates.end_date - dates.start_date).days + 1
+    assert body["incWorldwide"] is True
+    assert body["travellerInfo"][1] == {
+        "name": "Second Traveller", "relation": None, "dob": "1990-02-03",
+    }
+
+
+def test_first_matching_cover_wins_and_ids_match_across_types():
+    mapper = compile_coverage_spec(
+        {"block": {"a": "10", "b": "20", "c": "30"}}, _extract_amount
+    )
+    covers = [
+        {"id": "10", "values": [{"value": "100"}]},
+        {"id": 10, "values": [{"value": "999"}]},
+        {"id": 20, "values": [], "limit": 2500},
+        {"id": 30, "values": [], "limit": 0},
+    ]
+
+    assert mapper.map(covers) == {
+        "block": {"a": "USD 100", "b": "USD 2,500", "c": None}
+    }
+    assert mapper.map(None) == {"block": {"a": None, "b": None, "c": None}}
+
+
+def test_non_json_rating_response_is_an_error_and_not_cached(monkeypatch):
+    async def token():
+        return "token"
+
+    monkeypatch.setattr(rak, "get_rak_token", token)
+    transport.set_transport(httpx.MockTransport(
+        lambda request: httpx.Response(200, text="<html>maintenance</html>")
+    ))
+    body = build_rak_request(TravelInsuranceRequest(**travel_request(7)))
+    try:
+        result = asyncio.run(rak.rak_adapter.quote(body))
+    finally:
+        transport.set_transport(None)
+
+    assert result["plans"] == []
+    assert "invalid JSON" in result["error"]
+    assert quote_cache._get(request_fingerprint("rak", body)) is None
@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+import pytest
+
+from app.api.v1.endpoints.third_party.travel.errors import CircuitOpenError
+from app.api.v1.endpoints.third_party.travel.resilience import InsurerCircuit
+from app.api.v1.endpoints.third_party.travel.scheduler import InsurerLimiter
+
+
+def _circuit(**overrides):
+    options = dict(
+        window_size=10,
+        min_calls=4,
+        failure_rate=0.5,
+        open_seconds=0.05,
+        half_open_calls=1,
+        timeout_multiplier=2.0,
+        min_timeout=0.01,
+    )
+    options.update(overrides)
+    return InsurerCircuit("test:rating", **options)
+
+
+async def _ok(timeout):
+    return "ok"
+
+
+async def _boom(timeout):
+    raise ConnectionError("upstream down")
+
+
+def test_opens_after_failure_rate_then_fails_fast_and_recovers():
+    circuit = _circuit()
+
+    async def scenario():
+        for _ in range(4):
+            with pytest.raises(ConnectionError):
+                await circuit.call(_boom, max_timeout=1)
+        assert circuit.state == circuit.OPEN
+
+        with pytest.raises(CircuitOpenError):
+            await circuit.call(_ok, max_timeout=1)
+
+        await asyncio.sleep(0.06)
+        # half-open probe succeeds and closes the circuit
+        assert await circuit.call(_ok, max_timeout=1) == "ok"
+        assert circuit.state == circuit.CLOSED
+
+    asyncio.run(scenario())
+    assert circuit.rejected == 1
+
+
+def test_failed_probe_reopens_circuit():
+    circuit = _circuit()
+
+    async def scenario():
+        for _ in range(4):
+            with pytest.raises(ConnectionError):
+                await circuit.call(_boom, max_timeout=1)
+        await asyncio.sleep(0.06)
+        with pytest.raises(ConnectionError):
+            await circuit.call(_boom, max_timeout=1)
+        assert circuit.state == circuit.OPEN
+
+    asyncio.run(scenario())
+
+
+def test_timeout_adapts_to_observed_p95():
+    circuit = _circuit(min_calls=3)
+    assert circuit.timeout(max_timeout=30) == 30
+
+    async def scenario():
+        for _ in range(5):
+            await circuit.call(_ok, max_timeout=30)
+
+    asyncio.run(scenario())
+    # all calls were near-instant, so the timeout collapses to the floor
+    assert circuit.timeout(max_timeout=30) == pytest.approx(0.01)
+
+
+def test_hedged_request_wins_when_first_attempt_is_slow():
+    circuit = _circuit(min_calls=3, min_timeout=1)
+    attempts = []
+
+    async def warm(timeout):
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def attempt(timeout):
+        attempts.append(timeout)
+        if len(attempts) == 1:
+            await asyncio.sleep(1)
+            return "slow"
+        return "hedge"
+
+    async def scenario():
+        for _ in range(3):
+            await circuit.call(warm, max_timeout=5)
+        started = time.monotonic()
+        result = await circuit.call(attempt, max_timeout=5, hedge=True)
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(scenario())
+    assert result == "hedge"
+    assert len(attempts) == 2
+    assert elapsed < 0.5
+    assert circuit.hedged == 1
+
+
+def test_hedge_takes_an_outbound_slot_or_is_skipped():
+    limiter = InsurerLimiter("rak", rate=0, burst=1, max_concurrency=2, max_wait=1)
+
+    def hedge_slot():
+        return limiter.release if limiter.try_acquire() else None
+
+    async def warm(timeout):
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def slow(timeout):
+        await asyncio.sleep(0.2)
+        return "slow"
+
+    async def slower(timeout):
+        # beyond the p95 that now includes slow()
+        await asyncio.sleep(0.4)
+        return "slower"
+
+    async def scenario():
+        circuit = _circuit(min_calls=3, min_timeout=1)
+        for _ in range(3):
+            await circuit.call(warm, max_timeout=5)
+
+        # the first attempt holds one slot; the hedge gets the other
+        await limiter.acquire()
+        await circuit.call(slow, max_timeout=5, hedge=True, hedge_slot=hedge_slot)
+        limiter.release()
+        # the losing hedge is cancelled, which hands its slot back
+        await asyncio.sleep(0.01)
+        assert limiter.active == 0
+
+        # both slots taken: no hedge beyond the limiter
+        await limiter.acquire()
+        await limiter.acquire()
+        result = await circuit.call(slower, max_timeout=5, hedge=True, hedge_slot=hedge_slot)
+        return circuit, result
+
+    circuit, result = asyncio.run(scenario())
+    assert result == "slower"
+    assert circuit.hedged == 1
+    assert circuit.hedges_skipped == 1
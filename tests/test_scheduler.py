@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import orjson
+import pytest
+
+from app.api.v1.endpoints.third_party.travel.errors import InsurerQueueTimeout
+from app.api.v1.endpoints.third_party.travel.scheduler import (
+    BACKGROUND,
+    BATCH,
+    INTERACTIVE,
+    InsurerLimiter,
+)
+from app.utils.sse import sse_parallel
+
+
+def test_interactive_callers_overtake_queued_background_work():
+    async def scenario():
+        limiter = InsurerLimiter("rak", rate=0, burst=1, max_concurrency=1, max_wait=1)
+        await limiter.acquire(INTERACTIVE)
+        order = []
+
+        async def call(name, level):
+            await limiter.acquire(level)
+            order.append(name)
+            limiter.release()
+
+        tasks = [
+            asyncio.create_task(call("warm-up", BACKGROUND)),
+            asyncio.create_task(call("batch", BATCH)),
+            asyncio.create_task(call("quote", INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["quote", "batch", "warm-up"]
+
+
+def test_token_bucket_spaces_out_calls_beyond_the_burst():
+    async def scenario():
+        limiter = InsurerLimiter("rak", rate=20, burst=2, max_concurrency=10, max_wait=1)
+        started = time.monotonic()
+        for _ in range(4):
+            await limiter.acquire()
+            limiter.release()
+        return time.monotonic() - started
+
+    # two immediately, then one every 50ms
+    assert 0.08 <= asyncio.run(scenario()) < 0.5
+
+
+def test_queue_wait_is_bounded_and_reported_in_sse_event():
+    limiter = InsurerLimiter("rak", rate=0, burst=1, max_concurrency=1, max_wait=0.05)
+
+    async def quote():
+        await limiter.acquire()
+
+    async def scenario():
+        await limiter.acquire()  # slot held by someone else
+        with pytest.raises(InsurerQueueTimeout):
+            await limiter.acquire()
+        response = await sse_parallel([{"name": "rak", "func": quote, "timeout": 5}])
+        return [chunk async for chunk in response.body_iterator]
+
+    chunks = asyncio.run(scenario())
+    event = orjson.loads(chunks[0].split(b"data: ", 1)[1])
+    assert event["status"] == "queue_timeout"
+    assert limiter.status()["timeouts"] == 2
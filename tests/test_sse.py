@@ -0,0 +1,76 @@
+import asyncio
+
+import orjson
+
+from app.utils.sse import sse_parallel
+
+
+class _DisconnectedRequest:
+    async def is_disconnected(self):
+        return True
+
+
+async def _collect(response):
+    return [chunk async for chunk in response.body_iterator]
+
+
+def test_events_then_summary_with_per_source_status():
+    async def fast():
+        return {"plans": []}
+
+    async def slow():
+        await asyncio.sleep(5)
+
+    async def scenario():
+        response = await sse_parallel([
+            {"name": "fast", "func": fast},
+            {"name": "slow", "func": slow, "timeout": 0.05},
+        ])
+        return await _collect(response)
+
+    chunks = asyncio.run(scenario())
+    events = [orjson.loads(c.split(b"data: ", 1)[1]) for c in chunks]
+    assert [e.get("api") for e in events[:2]] == ["fast", "slow"]
+    assert chunks[-1].startswith(b"event: summary\n")
+    summary = events[-1]
+    assert summary["status"] == "complete"
+    assert summary["sources"]["fast"]["status"] == "ok"
+    assert summary["sources"]["slow"]["status"] == "timeout"
+
+
+def test_client_disconnect_cancels_outstanding_workers():
+    cancelled = asyncio.Event()
+
+    async def hanging():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def scenario():
+        response = await sse_parallel(
+            [{"name": "hanging", "func": hanging}],
+            request=_DisconnectedRequest(),
+            heartbeat_interval=0.01,
+        )
+        chunks = await _collect(response)
+        return chunks, cancelled.is_set()
+
+    chunks, was_cancelled = asyncio.run(scenario())
+    assert chunks == []
+    assert was_cancelled
+
+
+def test_error_card_is_reported_as_error():
+    async def failing():
+        return {"plans": [], "error": "RAK rating failed with HTTP 503"}
+
+    async def scenario():
+        response = await sse_parallel([{"name": "rak", "func": failing}])
+        return await _collect(response)
+
+    events = [orjson.loads(c.split(b"data: ", 1)[1]) for c in asyncio.run(scenario())]
+    assert events[0]["status"] == "error"
+    assert events[0]["response"]["error"] == "RAK rating failed with HTTP 503"
+    assert events[-1]["sources"]["rak"]["status"] == "error"
@@ -0,0 +1,254 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.db.models.third_party_api import ThirdPartyAuth
+from app.api.v1.endpoints.third_party.travel import scheduler, token_manager as tm
+
+
+def _rak_provider(token=None, expires_at=None):
+    return ThirdPartyAuth(
+        id=1,
+        name="RAK Insurance",
+        base_url="https://rak.test",
+        auth_url="/login",
+        auth_config={
+            "token": token,
+            "token_expires_at": expires_at.isoformat() if expires_at else None,
+        },
+    )
+
+
+def _fake_login(calls, lifetime=timedelta(hours=1)):
+    async def authenticate_provider(provider):
+        calls.append(provider.name)
+        await asyncio.sleep(0.01)
+        provider.auth_config["token"] = f"token-{len(calls)}"
+        provider.auth_config["token_expires_at"] = (
+            datetime.now(timezone.utc) + lifetime
+        ).isoformat()
+        return {"token": provider.auth_config["token"]}
+
+    return authenticate_provider
+
+
+def test_concurrent_cold_requests_share_one_login(monkeypatch):
+    calls = []
+    monkeypatch.setattr(tm, "authenticate_provider", _fake_login(calls))
+
+    async def scenario():
+        manager = tm.TokenManager(session_factory=None)
+        manager.add_provider(_rak_provider())
+        tokens = await asyncio.gather(*(manager.get_token("rak") for _ in range(20)))
+        await manager.close()
+        return tokens
+
+    tokens = asyncio.run(scenario())
+    assert calls == ["RAK Insurance"]
+    assert set(tokens) == {"token-1"}
+
+
+def test_valid_persisted_token_is_served_without_login(monkeypatch):
+    calls = []
+    monkeypatch.setattr(tm, "authenticate_provider", _fake_login(calls))
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=50)
+
+    async def scenario():
+        manager = tm.TokenManager(session_factory=None)
+        manager.add_provider(_rak_provider("persisted", expires_at))
+        token = await manager.get_token("rak")
+        await manager.close()
+        return token
+
+    assert asyncio.run(scenario()) == "persisted"
+    assert calls == []
+
+
+def test_token_near_expiry_is_renewed_in_background(monkeypatch):
+    calls = []
+    monkeypatch.setattr(tm, "authenticate_provider", _fake_login(calls))
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=2)
+
+    async def scenario():
+        manager = tm.TokenManager(session_factory=None, refresh_margin=timedelta(minutes=5))
+        manager.add_provider(_rak_provider("old", expires_at))
+        first = await manager.get_token("rak")
+        await asyncio.sleep(0.05)
+        second = await manager.get_token("rak")
+        await manager.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == "old"
+    assert second == "token-1"
+    assert calls == ["RAK Insurance"]
+
+
+def _shared_db():
+    # one SQLite file, one engine per simulated worker process
+    import tempfile
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from app.db.base import Base
+
+    url = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/tokens.db"
+
+    async def setup():
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine)() as db:
+            db.add(_rak_provider())
+            await db.commit()
+        await engine.dispose()
+
+    def worker():
+        engine = create_async_engine(url)
+        return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+    return setup, worker
+
+
+def test_workers_share_one_login_through_the_refresh_lease(monkeypatch):
+    calls = []
+    login = _fake_login(calls)
+
+    async def slow_login(provider):
+        await asyncio.sleep(0.2)
+        return await login(provider)
+
+    monkeypatch.setattr(tm, "authenticate_provider", slow_login)
+    setup, worker = _shared_db()
+
+    async def scenario():
+        await setup()
+        engines, managers = [], []
+        for _ in range(3):
+            engine, sessions = worker()
+            engines.append(engine)
+            lease = tm.TokenLease(sessions, lease_seconds=30, poll_interval=0.02)
+            managers.append(tm.TokenManager(session_factory=sessions, lease=lease, lease_wait=5))
+
+        tokens = await asyncio.gather(*(m.get_token("rak") for m in managers))
+
+        # a token the insurer rejected is not adopted back from the DB
+        managers[1].invalidate("rak")
+        renewed = await managers[1].get_token("rak")
+
+        for manager in managers:
+            await manager.close()
+        for engine in engines:
+            await engine.dispose()
+        return tokens, renewed
+
+    tokens, renewed = asyncio.run(scenario())
+    assert calls == ["RAK Insurance"] * 2
+    assert set(tokens) == {"token-1"}
+    assert renewed == "token-2"
+
+
+def test_row_lock_lease_is_short_and_publishes_the_token():
+    # the Postgres strategy (SELECT ... FOR UPDATE, stamp, commit), forced on
+    # SQLite: sequential here, so only the lease bookkeeping is exercised
+    setup, worker = _shared_db()
+
+    async def scenario():
+        await setup()
+        engine, sessions = worker()
+        first = tm.TokenLease(sessions, lease_seconds=30, row_locks=True)
+        second = tm.TokenLease(sessions, lease_seconds=30, row_locks=True)
+
+        async with first.hold(1) as lease:
+            assert lease is not None and lease.auth_config["token"] is None
+            # no connection (or transaction) is held while the holder logs in
+            assert engine.sync_engine.pool.checkedout() == 0
+            async with second.hold(1) as other:
+                assert other is None
+            lease.publish({"token": "fresh", "token_expires_at": None})
+
+        async with sessions() as db:
+            published = (await db.get(ThirdPartyAuth, 1)).auth_config
+
+        # an abandoned lease expires and can be taken over
+        expired = tm.TokenLease(sessions, lease_seconds=-1, row_locks=True)
+        async with expired.hold(1) as stale:
+            async with second.hold(1) as taken_over:
+                assert stale is not None and taken_over is not None
+
+        await engine.dispose()
+        return published
+
+    assert asyncio.run(scenario()) == {"token": "fresh", "token_expires_at": None}
+
+
+def test_background_refresh_is_promoted_once_a_quote_waits_on_it(monkeypatch):
+    order = []
+    login = _fake_login([])
+
+    async def authenticate_provider(provider):
+        async with scheduler.outbound("rak"):
+            order.append("login")
+            return await login(provider)
+
+    monkeypatch.setattr(tm, "authenticate_provider", authenticate_provider)
+    monkeypatch.setattr(scheduler.settings, "INSURER_LIMIT_OVERRIDES", {
+        "rak": {"rate": 0, "burst": 1, "concurrency": 1, "max_wait": 5},
+    })
+
+    async def scenario():
+        limiter = scheduler.get_limiter("rak")
+        await limiter.acquire()  # slot held by an in-flight quote
+        manager = tm.TokenManager(session_factory=None)
+        manager.add_provider(_rak_provider())
+
+        async def batch_call():
+            async with scheduler.outbound("rak"):
+                order.append("batch")
+
+        async def queued(n):
+            while limiter.status()["waiting"] < n:
+                await asyncio.sleep(0)
+
+        with scheduler.priority(scheduler.BACKGROUND):
+            warm_up = asyncio.create_task(manager.get_token("rak"))
+        await queued(1)
+        with scheduler.priority(scheduler.BATCH):
+            batch = asyncio.create_task(batch_call())
+        await queued(2)
+
+        # nobody interactive waits yet: the login is queued behind the batch call
+        assert limiter._queue.priorities() == [
+            scheduler.BATCH,
+            scheduler.BACKGROUND,
+        ]
+
+        quote = asyncio.create_task(manager.get_token("rak"))
+        await asyncio.sleep(0)
+        limiter.release()
+        tokens = await asyncio.gather(warm_up, quote, batch)
+        await manager.close()
+        return tokens
+
+    tokens = asyncio.run(scenario())
+    assert tokens[:2] == ["token-1", "token-1"]
+    assert order == ["login", "batch"]
+
+
+def test_refresh_nobody_interactive_waits_on_stays_in_the_background(monkeypatch):
+    seen = []
+    login = _fake_login([])
+
+    async def authenticate_provider(provider):
+        seen.append(scheduler.current_priority())
+        return await login(provider)
+
+    monkeypatch.setattr(tm, "authenticate_provider", authenticate_provider)
+
+    async def scenario():
+        manager = tm.TokenManager(session_factory=None)
+        manager.add_provider(_rak_provider())
+        with scheduler.priority(scheduler.BACKGROUND):
+            token = await manager.get_token("rak")
+        await manager.close()
+        return token
+
+    assert asyncio.run(scenario()) == "token-1"
+    assert seen == [scheduler.BACKGROUND]
@@ -1,9 +1,64 @@
-import asyncio
-from httpx import AsyncClient
+import orjson
+from fastapi.testclient import TestClient
+
 from app.main import app
+from benchmarks.insurer_simulator import InsurerSimulator
+
+
+def test_register_login_and_fetch_user():
+    # the simulator answers the insurer logins started by the app lifespan
+    with InsurerSimulator(), TestClient(app) as client:
+        assert client.get("/health/live").json() == {"status": "ok"}
+
+        credentials = {"email": "user-test@example.com", "password": "s3cret-pass"}
+        r = client.post("/api/v1/users/register", json=credentials)
+        assert r.status_code == 200
+        user_id = r.json()["user"]["id"]
+
+        r = client.post("/api/v1/users/login", json=credentials)
+        assert r.status_code == 200
+        token = r.json()["access_token"]
+        assert token
 
-async def test_root():
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        r = await ac.get("/")
+        r = client.post("/api/v1/users/login", json={**credentials, "password": "wrong"})
+        assert r.status_code == 400
+
+        r = client.get(f"/api/v1/users/user/{user_id}")
         assert r.status_code == 200
-        assert r.json()["ok"] is True
+        assert r.json()["email"] == credentials["email"]
+
+
+def test_list_users_by_keyset_pages_and_export():
+    emails = [f"page-{i}@example.com" for i in range(5)]
+    with InsurerSimulator(), TestClient(app) as client:
+        for email in emails:
+            r = client.post("/api/v1/users/register", json={"email": email, "password": "pw"})
+            assert r.status_code == 200
+        token = r.json()["access_token"]
+
+        # user data is not public
+        assert client.get("/api/v1/users").status_code == 401
+        assert client.get("/api/v1/users/export").status_code == 401
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        ids, after = [], None
+        while True:
+            params = {"limit": 2} if after is None else {"limit": 2, "after": after}
+            page = client.get("/api/v1/users", params=params).json()
+            assert len(page["items"]) <= 2
+            ids.extend(user["id"] for user in page["items"])
+            after = page["next_after"]
+            if after is None:
+                break
+        assert ids == sorted(set(ids))
+
+        r = client.get("/api/v1/users/export")
+        assert r.headers["content-type"] == "application/x-ndjson"
+        rows = [orjson.loads(line) for line in r.content.splitlines()]
+        assert [row["id"] for row in rows] == ids
+        assert set(emails) <= {row["email"] for row in rows}
+
+        r = client.get("/api/v1/users/export", params={"format": "csv"})
+        lines = r.text.splitlines()
+        assert lines[0] == "id,email,full_name,is_active"
+        assert len(lines) == len(ids) + 1